@@ -0,0 +1,121 @@
+"""
+Shared NumPy drawing helpers for the nanobot simulations.
+Frames are composited on an (height, width, 3) uint8 canvas from pre-rendered
+sprites; only text and other per-frame overlays go through PIL.
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+
+def blit(canvas, rgb, mask, x0, y0):
+    """Copy the masked pixels of a sprite onto the canvas at (x0, y0), clipped to its bounds."""
+    h, w = mask.shape
+    cx0, cy0 = max(x0, 0), max(y0, 0)
+    cx1, cy1 = min(x0 + w, canvas.shape[1]), min(y0 + h, canvas.shape[0])
+    if cx0 >= cx1 or cy0 >= cy1:
+        return
+    sub = (slice(cy0 - y0, cy1 - y0), slice(cx0 - x0, cx1 - x0))
+    np.copyto(canvas[cy0:cy1, cx0:cx1], rgb[sub], where=mask[sub][..., None])
+
+
+def fill_rect(canvas, x0, y0, x1, y1, color):
+    """Solid rectangle with inclusive bounds, like ImageDraw.rectangle(fill=...)."""
+    canvas[y0:y1 + 1, x0:x1 + 1] = color
+
+
+def sprite_arrays(sprite):
+    """Split an RGBA sprite into its RGB array and boolean opacity mask."""
+    arr = np.asarray(sprite)
+    return arr[..., :3], arr[..., 3] > 0
+
+
+def draw_vein(canvas, top, bottom, color, thickness):
+    """
+    Paint the vein walls: `thickness` rows above `top` and below `bottom`,
+    bounds inclusive like ImageDraw.rectangle.
+    """
+    canvas[top - thickness:top + 1] = color
+    canvas[bottom:bottom + thickness + 1] = color
+
+
+@lru_cache(maxsize=None)
+def bot_sprite(radius, glow_radius, body_color, outline_color, glow_color,
+               glow_outline=(100, 150, 255)):
+    """Nanobot glow and body as an RGB array and mask, centred at (glow_radius, glow_radius)."""
+    c = glow_radius
+    sprite = Image.new('RGBA', (2 * c + 1, 2 * c + 1), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite)
+    draw.ellipse([0, 0, 2 * c, 2 * c], fill=glow_color, outline=glow_outline, width=1)
+    draw.ellipse([c - radius, c - radius, c + radius, c + radius],
+                 fill=body_color, outline=outline_color, width=2)
+    return sprite_arrays(sprite)
+
+
+def draw_bot(canvas, x, y, radius, body_color, outline_color, glow_color, glow_radius):
+    """Composite the nanobot centred at (x, y) using its cached sprite."""
+    rgb, mask = bot_sprite(radius, glow_radius, body_color, outline_color, glow_color)
+    # PIL truncates float ellipse coordinates, so sprites land at the floor
+    blit(canvas, rgb, mask, math.floor(x) - glow_radius, math.floor(y) - glow_radius)
+
+
+def sprite_table(sprites):
+    """
+    Flatten (rgb, mask) sprites into one table of opaque pixels for
+    stamp_sprites: (dy, dx, colors, starts, sizes), sprite k owning rows
+    starts[k]:starts[k] + sizes[k].
+    """
+    dys, dxs, colors = [], [], []
+    for rgb, mask in sprites:
+        dy, dx = np.nonzero(mask)
+        dys.append(dy)
+        dxs.append(dx)
+        colors.append(rgb[dy, dx])
+    sizes = np.array([dy.size for dy in dys])
+    starts = np.cumsum(sizes) - sizes
+    return np.concatenate(dys), np.concatenate(dxs), np.concatenate(colors), starts, sizes
+
+
+def stamp_sprites(canvas, table, kinds, x0, y0):
+    """
+    Blit sprite kinds[i] of a sprite_table with its top-left at (x0[i], y0[i])
+    for every i in one scatter, clipped to the canvas. Pixels are written in
+    sprite order, so later sprites cover earlier ones where they overlap.
+    """
+    dy, dx, colors, starts, sizes = table
+    counts = sizes[kinds]
+    owner = np.repeat(np.arange(kinds.size), counts)
+    pixel = starts[kinds][owner] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows = y0[owner] + dy[pixel]
+    cols = x0[owner] + dx[pixel]
+    h, w = canvas.shape[:2]
+    visible = (rows >= 0) & (rows < h) & (cols >= 0) & (cols < w)
+    canvas.reshape(-1, canvas.shape[2])[rows[visible] * w + cols[visible]] = colors[pixel[visible]]
+
+
+@lru_cache(maxsize=1024)
+def text_mask(text, font):
+    """Antialiased coverage of `text` drawn at (0, 0) in `font`, as a uint8 array."""
+    _, _, right, bottom = font.getbbox(text)
+    mask = Image.new('L', (right + 2, bottom + 2), 0)
+    ImageDraw.Draw(mask).text((0, 0), text, fill=255, font=font)
+    return np.asarray(mask)
+
+
+def draw_text(canvas, xy, text, color, font):
+    """
+    Blend text into the canvas at integer (x, y), matching ImageDraw.text on
+    an RGB image. Glyph coverage is cached per string.
+    """
+    alpha = text_mask(text, font)
+    x0, y0 = int(xy[0]), int(xy[1])
+    h, w = alpha.shape
+    cx0, cy0 = max(x0, 0), max(y0, 0)
+    cx1, cy1 = min(x0 + w, canvas.shape[1]), min(y0 + h, canvas.shape[0])
+    if cx0 >= cx1 or cy0 >= cy1:
+        return
+    a = alpha[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0, None].astype(np.uint16)
+    region = canvas[cy0:cy1, cx0:cx1]
+    region[:] = (np.array(color, dtype=np.uint16) * a + region * (255 - a) + 127) // 255
@@ -5,29 +5,51 @@ Creates an MP4 video showing temporary microplug closure and longer-term valve r
 """
 import os
 import math
-import random
 import argparse
-from PIL import Image, ImageDraw
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
 
 ROLE_ORDER = ("Scout", "Worker", "Repair", "Monitor")
-ROLE_COLORS = {
-    "Scout": (70, 190, 235),
-    "Worker": (245, 140, 60),
-    "Repair": (140, 200, 120),
-    "Monitor": (90, 160, 180),
-}
-ROLE_OUTLINES = {
-    "Scout": (40, 120, 170),
-    "Worker": (170, 90, 40),
-    "Repair": (70, 140, 70),
-    "Monitor": (30, 90, 110),
-}
-ROLE_SIZES = {
-    "Scout": 3,
-    "Worker": 5,
-    "Repair": 4,
-    "Monitor": 3,
-}
+ROLE_IDS = {role: idx for idx, role in enumerate(ROLE_ORDER)}
+SCOUT, WORKER, REPAIR, MONITOR = range(len(ROLE_ORDER))
+BEACON_ROLE_IDS = [SCOUT, WORKER, REPAIR]
+BRANCH_IDS = np.array([1, 2, 3], dtype=np.uint8)
+# Per-role render tables, indexed by role id (ROLE_ORDER).
+ROLE_COLORS = (
+    (70, 190, 235),
+    (245, 140, 60),
+    (140, 200, 120),
+    (90, 160, 180),
+)
+ROLE_OUTLINES = (
+    (40, 120, 170),
+    (170, 90, 40),
+    (70, 140, 70),
+    (30, 90, 110),
+)
+ROLE_SIZES = (3, 5, 4, 3)
+# Speed multiplier indexed by [role id, agent is on the faulty segment].
+ROLE_SPEED_SCALE = np.array([
+    [1.0, 1.0],
+    [1.0, 0.6],
+    [1.0, 0.5],
+    [0.85, 0.85],
+])
+BACKGROUND_COLOR = (245, 245, 250)
+TRACER_COLOR = (90, 140, 200)
+MAX_TRACERS = 30  # int(8 + 22 * max flow share)
+DOT_OFFSETS = np.array([(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)], dtype=np.int32)
+UI_FONT = ImageFont.load_default()
+TEXT_CACHE_LIMIT = 512
+_text_cache = {}
+SENSOR_DTYPE = np.dtype([
+    ("viscosity", "f4"),
+    ("impedance", "f4"),
+    ("reflectance", "f4"),
+    ("strain", "f4"),
+    ("abnormal", "f4"),
+])
 
 
 def clamp(value, low, high):
@@ -59,19 +81,11 @@ class VeinSegment:
         self.reflux = 0.0
         self.valve_competence = 1.0
         self.permeability = 1.0
-        self.sensors = {}
 
     def midpoint(self):
         return ((self.start[0] + self.end[0]) / 2.0, (self.start[1] + self.end[1]) / 2.0)
 
 
-class SwarmAgent:
-    def __init__(self, role, segment_id, t):
-        self.role = role
-        self.segment_id = segment_id
-        self.t = t
-
-
 def build_network():
     segments = [
         VeinSegment(0, (80, 320), (280, 320), "Trunk"),
@@ -98,88 +112,99 @@ def initialize_pathology(segments):
             seg.valve_competence = 0.95
 
 
-def compute_sensors(seg):
-    viscosity = 4.5 + 28.0 * seg.pooling + 18.0 * seg.reflux
-    impedance = 1.0 + 60.0 * seg.pooling + 35.0 * seg.reflux
-    reflectance = 0.10 + 0.45 * seg.pooling + 0.25 * seg.reflux
-    strain = 0.15 + 0.6 * seg.pooling + 0.9 * seg.reflux
-
-    visc_norm = clamp((viscosity - 4.5) / 40.0, 0.0, 1.0)
-    imp_norm = clamp((impedance - 1.0) / 95.0, 0.0, 1.0)
-    refl_norm = clamp((reflectance - 0.10) / 0.75, 0.0, 1.0)
-    strain_norm = clamp(strain / 1.2, 0.0, 1.0)
-
-    seg.sensors = {
-        "viscosity": viscosity,
-        "impedance": impedance,
-        "reflectance": reflectance,
-        "strain": strain,
-        "visc_norm": visc_norm,
-        "imp_norm": imp_norm,
-        "refl_norm": refl_norm,
-        "strain_norm": strain_norm,
-        "abnormal": (visc_norm + imp_norm + refl_norm + strain_norm) / 4.0,
-    }
+def compute_sensors(segments):
+    pooling = np.array([seg.pooling for seg in segments], dtype=np.float32)
+    reflux = np.array([seg.reflux for seg in segments], dtype=np.float32)
+
+    sensors = np.empty(len(segments), dtype=SENSOR_DTYPE)
+    sensors["viscosity"] = 4.5 + 28.0 * pooling + 18.0 * reflux
+    sensors["impedance"] = 1.0 + 60.0 * pooling + 35.0 * reflux
+    sensors["reflectance"] = 0.10 + 0.45 * pooling + 0.25 * reflux
+    sensors["strain"] = 0.15 + 0.6 * pooling + 0.9 * reflux
+
+    visc_norm = np.clip((sensors["viscosity"] - 4.5) / 40.0, 0.0, 1.0)
+    imp_norm = np.clip((sensors["impedance"] - 1.0) / 95.0, 0.0, 1.0)
+    refl_norm = np.clip((sensors["reflectance"] - 0.10) / 0.75, 0.0, 1.0)
+    strain_norm = np.clip(sensors["strain"] / 1.2, 0.0, 1.0)
+    sensors["abnormal"] = (visc_norm + imp_norm + refl_norm + strain_norm) / 4.0
+    return sensors
 
 
 def create_agents(swarm_size, rng):
-    counts = {
-        "Scout": int(swarm_size * 0.25),
-        "Worker": int(swarm_size * 0.4),
-        "Repair": int(swarm_size * 0.2),
+    """Create the swarm as flat per-agent arrays (role id, segment id, position t)."""
+    counts = [
+        int(swarm_size * 0.25),
+        int(swarm_size * 0.4),
+        int(swarm_size * 0.2),
+    ]
+    counts.append(swarm_size - sum(counts))
+
+    role_id = np.repeat(np.arange(len(ROLE_ORDER), dtype=np.uint8), counts)
+    rng.shuffle(role_id)
+
+    return {
+        "role_id": role_id,
+        "segment_id": np.zeros(swarm_size, dtype=np.uint8),
+        "t": rng.random(swarm_size, dtype=np.float32),
     }
-    counts["Monitor"] = swarm_size - sum(counts.values())
 
-    roles = []
-    for role, count in counts.items():
-        roles.extend([role] * count)
-    rng.shuffle(roles)
 
-    agents = []
-    for role in roles:
-        agents.append(SwarmAgent(role, 0, rng.random()))
-    return agents
+def role_counts(role_ids):
+    counts = np.bincount(role_ids, minlength=len(ROLE_ORDER))
+    return {role: int(counts[idx]) for idx, role in enumerate(ROLE_ORDER)}
 
 
-def role_counts(agents):
-    counts = {role: 0 for role in ROLE_ORDER}
-    for agent in agents:
-        counts[agent.role] += 1
-    return counts
+def find_faulty_index(segments):
+    return next(idx for idx, seg in enumerate(segments) if seg.is_faulty)
 
 
-def compute_flow_shares(segments, plug_progress):
-    faulty_segment = next(seg for seg in segments if seg.is_faulty)
+def compute_flow_shares(segments, plug_progress, faulty_idx):
+    faulty_segment = segments[faulty_idx]
     faulty_segment.permeability = clamp(1.0 - plug_progress, 0.05, 1.0)
 
-    weights = {
-        1: 1.0,
-        2: 0.9 * faulty_segment.permeability * (0.35 + 0.65 * faulty_segment.valve_competence),
-        3: 0.7,
-    }
-    total = sum(weights.values())
-    shares = {seg_id: weight / total for seg_id, weight in weights.items()}
+    weights = np.array([
+        1.0,
+        0.9 * faulty_segment.permeability * (0.35 + 0.65 * faulty_segment.valve_competence),
+        0.7,
+    ])
+    # Index 0 is the trunk, which always carries the full flow.
+    shares = np.ones(len(segments))
+    shares[1:] = weights / weights.sum()
     return shares
 
 
-def choose_branch(flow_shares, segments, role, rng, beacon_bias):
-    branch_ids = [1, 2, 3]
-    weights = []
-    for seg_id in branch_ids:
+def branch_cumulative_weights(flow_shares, segments, beacon_bias):
+    weights = np.empty((len(ROLE_ORDER), len(BRANCH_IDS)))
+    for col, seg_id in enumerate(BRANCH_IDS):
         seg = segments[seg_id]
-        weight = flow_shares.get(seg_id, 0.0) + 0.05
-        if role in ("Worker", "Repair", "Scout") and seg.is_faulty:
-            weight += beacon_bias
-        if role == "Monitor":
-            weight += (1.0 - seg.mapping) * 0.4
-        weights.append(weight)
-    total = sum(weights)
-    pick = rng.random() * total
-    for seg_id, weight in zip(branch_ids, weights):
-        pick -= weight
-        if pick <= 0:
-            return seg_id
-    return branch_ids[-1]
+        weights[:, col] = flow_shares[seg_id] + 0.05
+        if seg.is_faulty:
+            weights[BEACON_ROLE_IDS, col] += beacon_bias
+        weights[MONITOR, col] += (1.0 - seg.mapping) * 0.4
+    return np.cumsum(weights, axis=1)
+
+
+def choose_branches(cum_weights, rng):
+    """Sample one branch id per row of a (n, branch) cumulative weight table."""
+    picks = rng.random(len(cum_weights)) * cum_weights[:, -1]
+    idx = np.count_nonzero(picks[:, None] > cum_weights, axis=1)
+    return BRANCH_IDS[np.minimum(idx, len(BRANCH_IDS) - 1)]
+
+
+def segment_geometry(segments):
+    """Return per-segment start x/y, unit direction x/y and length arrays."""
+    start = np.array([seg.start for seg in segments], dtype=np.float64)
+    end = np.array([seg.end for seg in segments], dtype=np.float64)
+    delta = end - start
+    length = np.hypot(delta[:, 0], delta[:, 1])
+    unit = delta / np.where(length > 0, length, 1.0)[:, None]
+    return start[:, 0], start[:, 1], unit[:, 0], unit[:, 1], length
+
+
+def draw_dots(draw, xs, ys, color):
+    centers = np.stack([np.rint(xs), np.rint(ys)], axis=1).astype(np.int32)
+    points = (centers[:, None, :] + DOT_OFFSETS[None, :, :]).reshape(-1)
+    draw.point(points.tolist(), fill=color)
 
 
 def draw_arrow(draw, start, end, color, direction=1):
@@ -199,7 +224,20 @@ def draw_arrow(draw, start, end, color, direction=1):
     draw.polygon([left, right, (tip_x, tip_y)], fill=color)
 
 
-def draw_ui(draw, width, height, status_lines, side_lines):
+def blit_text(img, xy, text, color):
+    key = (text, color)
+    cached = _text_cache.get(key)
+    if cached is None:
+        if len(_text_cache) >= TEXT_CACHE_LIMIT:
+            _text_cache.clear()
+        _, _, right, bottom = UI_FONT.getbbox(text)
+        cached = Image.new("RGBA", (max(1, int(right)), max(1, int(bottom))), (0, 0, 0, 0))
+        ImageDraw.Draw(cached).text((0, 0), text, fill=color, font=UI_FONT)
+        _text_cache[key] = cached
+    img.paste(cached, xy, cached)
+
+
+def draw_ui(img, draw, width, height, status_lines, side_lines):
     panel_bg = (240, 240, 245)
     panel_border = (80, 80, 90)
 
@@ -207,23 +245,24 @@ def draw_ui(draw, width, height, status_lines, side_lines):
     draw.rectangle(status_panel, fill=panel_bg, outline=panel_border)
     x = 20
     for text, color in status_lines:
-        draw.text((x, 20), text, fill=color)
+        blit_text(img, (x, 20), text, color)
         x += 200
 
     side_panel = [width - 270, 70, width - 10, height - 20]
     draw.rectangle(side_panel, fill=panel_bg, outline=panel_border)
     y = 80
     for text, color in side_lines:
-        draw.text((width - 260, y), text, fill=color)
+        blit_text(img, (width - 260, y), text, color)
         y += 16
 
 
 def render_frame(
-    width,
-    height,
+    img,
+    draw,
     segments,
     agents,
-    tracers,
+    tracer_buf,
+    tracer_n,
     flow_shares,
     reflux_direction,
     plug_progress,
@@ -233,8 +272,8 @@ def render_frame(
     side_lines,
     render_rng,
 ):
-    img = Image.new("RGB", (width, height), color=(245, 245, 250))
-    draw = ImageDraw.Draw(img)
+    width, height = img.size
+    draw.rectangle([0, 0, width, height], fill=BACKGROUND_COLOR)
 
     base_color = (170, 110, 120)
     vessel_shadow = (200, 160, 165)
@@ -265,7 +304,10 @@ def render_frame(
             draw.line([p1, p2], fill=(250, 210, 90), width=5)
             draw.ellipse([mid_x - 6, mid_y - 6, mid_x + 6, mid_y + 6], fill=(250, 190, 80))
 
-    for seg_id, tracer_list in tracers.items():
+    for seg_id, count in enumerate(tracer_n.tolist()):
+        if count == 0:
+            continue
+        tracer_t = tracer_buf[seg_id, :count]
         seg = segments[seg_id]
         dx = seg.end[0] - seg.start[0]
         dy = seg.end[1] - seg.start[1]
@@ -273,11 +315,11 @@ def render_frame(
         ux, uy = dx / length, dy / length
         px, py = -uy, ux
 
-        for t in tracer_list:
-            offset = render_rng.uniform(-2.5, 2.5)
-            x = seg.start[0] + ux * seg.length * t + px * offset
-            y = seg.start[1] + uy * seg.length * t + py * offset
-            draw.ellipse([x - 2, y - 2, x + 2, y + 2], fill=(90, 140, 200))
+        offset = render_rng.uniform(-2.5, 2.5, size=len(tracer_t))
+        along = seg.length * tracer_t
+        xs = seg.start[0] + ux * along + px * offset
+        ys = seg.start[1] + uy * along + py * offset
+        draw_dots(draw, xs, ys, TRACER_COLOR)
 
     for seg in segments:
         if seg.seg_id == 0:
@@ -291,31 +333,27 @@ def render_frame(
             arrow_color = (220, 90, 90)
         draw_arrow(draw, seg.start, seg.end, arrow_color, direction=direction)
 
-    for agent in agents:
-        seg = segments[agent.segment_id]
-        dx = seg.end[0] - seg.start[0]
-        dy = seg.end[1] - seg.start[1]
-        length = math.hypot(dx, dy) or 1.0
-        ux, uy = dx / length, dy / length
-        px, py = -uy, ux
-
-        jitter = 0.9
-        offset = render_rng.uniform(-jitter, jitter)
-        x = seg.start[0] + ux * seg.length * agent.t + px * offset
-        y = seg.start[1] + uy * seg.length * agent.t + py * offset
-
-        radius = ROLE_SIZES[agent.role]
-        color = ROLE_COLORS[agent.role]
-        outline = ROLE_OUTLINES[agent.role]
+    seg_id = agents["segment_id"]
+    start_x, start_y, dir_x, dir_y, seg_len = segment_geometry(segments)
+    offset = render_rng.uniform(-0.9, 0.9, size=len(seg_id))
+    along = seg_len[seg_id] * agents["t"]
+    # The perpendicular of (ux, uy) is (-uy, ux).
+    xs = start_x[seg_id] + dir_x[seg_id] * along - dir_y[seg_id] * offset
+    ys = start_y[seg_id] + dir_y[seg_id] * along + dir_x[seg_id] * offset
+
+    for x, y, role_id in zip(xs.tolist(), ys.tolist(), agents["role_id"].tolist()):
+        radius = ROLE_SIZES[role_id]
+        color = ROLE_COLORS[role_id]
+        outline = ROLE_OUTLINES[role_id]
         draw.ellipse([x - radius, y - radius, x + radius, y + radius], fill=color, outline=outline)
 
-        if agent.role == "Scout":
+        if role_id == SCOUT:
             draw.ellipse([x - radius - 2, y - radius - 2, x + radius + 2, y + radius + 2],
                          outline=(200, 230, 250), width=1)
-        if agent.role == "Monitor":
+        if role_id == MONITOR:
             draw.ellipse([x - radius, y - radius, x + radius, y + radius], outline=outline, width=1)
 
-    draw_ui(draw, width, height, status_lines, side_lines)
+    draw_ui(img, draw, width, height, status_lines, side_lines)
     return img
 
 
@@ -328,38 +366,54 @@ def create_flow_redirection_simulation(
     fps=30,
     seed=7,
     save_frames=0,
+    no_render=0,
+    output_tag="",
 ):
     import imageio
 
-    rng = random.Random(seed)
-    render_rng = random.Random(seed + 101)
+    rng = np.random.default_rng(seed)
+    render_rng = np.random.default_rng(seed + 101)
+    tracer_rng = np.random.default_rng(seed + 202)
 
     output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs")
     os.makedirs(output_dir, exist_ok=True)
-    video_path = os.path.join(output_dir, "flow_redirection_swarm_sim.mp4")
+    video_path = os.path.join(output_dir, f"flow_redirection_swarm_sim{output_tag}.mp4")
 
     width, height = 800, 600
     num_frames = int(duration_sec * fps)
 
     segments = build_network()
     initialize_pathology(segments)
+    faulty_idx = find_faulty_index(segments)
+    faulty_seg = segments[faulty_idx]
 
     agents = create_agents(swarm_size, rng)
-    tracers = {seg.seg_id: [] for seg in segments}
+    seg_lengths = np.array([seg.length for seg in segments])
+    # Each segment's tracers live in the active prefix tracer_buf[seg_id, :tracer_n[seg_id]].
+    tracer_buf = np.zeros((len(segments), MAX_TRACERS), dtype=np.float32)
+    tracer_n = np.zeros(len(segments), dtype=np.intp)
 
     plug_progress = 0.0
     plug_state = "inactive"
     plug_timer = 0.0
     plug_hold_time = 4.0
     plug_dissolve_time = 4.0
+    dt = 1.0 / fps
+    dissolve_rate = 1.0 / (plug_dissolve_time * fps)
 
     worker_threshold = max(12, int(swarm_size * 0.08))
 
-    if save_frames:
-        frame_dir = os.path.join(output_dir, "flow_redirection_frames")
+    if save_frames and not no_render:
+        frame_dir = os.path.join(output_dir, f"flow_redirection_frames{output_tag}")
         os.makedirs(frame_dir, exist_ok=True)
 
-    frames = []
+    writer = None
+    if not no_render:
+        print(f"Writing video to {video_path}...", flush=True)
+        writer = imageio.get_writer(video_path, fps=fps)
+        # One frame buffer is reused for the whole run; the writer copies each frame.
+        frame_buf = Image.new("RGB", (width, height), color=BACKGROUND_COLOR)
+        frame_draw = ImageDraw.Draw(frame_buf)
 
     for frame_idx in range(num_frames):
         time_sec = frame_idx / fps
@@ -370,15 +424,14 @@ def create_flow_redirection_simulation(
         else:
             phase_label = "Remodeling"
 
-        flow_shares = compute_flow_shares(segments, plug_progress)
-        faulty_seg = next(seg for seg in segments if seg.is_faulty)
+        flow_shares = compute_flow_shares(segments, plug_progress, faulty_idx)
 
         reflux_base = clamp((1.0 - faulty_seg.valve_competence) * 0.9 * faulty_seg.permeability, 0.0, 1.0)
         reflux_pulse = reflux_base * (0.6 + 0.4 * math.sin(time_sec * 2.4))
         faulty_seg.reflux = reflux_pulse
         reflux_direction = -1 if reflux_pulse > 0.55 and plug_progress < 0.2 else 1
 
-        pooling_delta = (reflux_pulse * 0.018 - flow_shares[2] * 0.013 - plug_progress * 0.02) / fps
+        pooling_delta = (reflux_pulse * 0.018 - flow_shares[2] * 0.013 - plug_progress * 0.02) * dt
         pooling_delta -= faulty_seg.valve_competence * 0.003
         faulty_seg.pooling = clamp(faulty_seg.pooling + pooling_delta, 0.0, 1.0)
 
@@ -390,52 +443,39 @@ def create_flow_redirection_simulation(
             else:
                 seg.reflux = 0.0
             seg.beacon *= 0.9
-            compute_sensors(seg)
-
-        worker_on_faulty = 0
-        repair_on_faulty = 0
-
-        for agent in agents:
-            seg = segments[agent.segment_id]
-            abnormal = seg.sensors.get("abnormal", 0.0)
-
-            if agent.role == "Scout" and seg.is_faulty and abnormal > 0.45:
-                seg.beacon = clamp(seg.beacon + beacon_strength * 0.04, 0.0, 1.0)
-
-            if agent.role == "Worker" and seg.is_faulty:
-                worker_on_faulty += 1
+        abnormal_by_seg = compute_sensors(segments)["abnormal"]
 
-            if agent.role == "Repair" and seg.is_faulty:
-                repair_on_faulty += 1
+        role_id = agents["role_id"]
+        seg_id = agents["segment_id"]
+        on_faulty = seg_id == faulty_idx
 
-            if agent.role == "Monitor":
-                seg.mapping = clamp(seg.mapping + 0.003, 0.0, 1.0)
-
-            base_speed = flow * (0.7 + 0.8 * flow_shares.get(seg.seg_id, 1.0))
-            if agent.role == "Worker" and seg.is_faulty:
-                base_speed *= 0.6
-            if agent.role == "Repair" and seg.is_faulty:
-                base_speed *= 0.5
-            if agent.role == "Monitor":
-                base_speed *= 0.85
-
-            direction = 1
-            if seg.is_faulty and reflux_direction < 0:
-                direction = -1
-
-            speed = max(0.05, base_speed + rng.uniform(-noise, noise))
-            step = speed / seg.length
-            agent.t += step * direction
-
-            if agent.t > 1.0 or agent.t < 0.0:
-                if seg.seg_id == 0:
-                    beacon_bias = segments[2].beacon * 0.8
-                    next_id = choose_branch(flow_shares, segments, agent.role, rng, beacon_bias)
-                    agent.segment_id = next_id
-                    agent.t = 0.0 if direction > 0 else 1.0
-                else:
-                    agent.segment_id = 0
-                    agent.t = 0.0 if direction > 0 else 1.0
+        scouts_flagging = np.count_nonzero(
+            (role_id == SCOUT) & on_faulty & (abnormal_by_seg[seg_id] > 0.45)
+        )
+        if scouts_flagging:
+            faulty_seg.beacon = clamp(faulty_seg.beacon + beacon_strength * 0.04 * scouts_flagging, 0.0, 1.0)
+
+        worker_on_faulty = np.count_nonzero((role_id == WORKER) & on_faulty)
+        repair_on_faulty = np.count_nonzero((role_id == REPAIR) & on_faulty)
+
+        monitor_hits = np.bincount(seg_id[role_id == MONITOR], minlength=len(segments))
+        for seg, hits in zip(segments, monitor_hits.tolist()):
+            if hits:
+                seg.mapping = clamp(seg.mapping + 0.003 * hits, 0.0, 1.0)
+
+        base_speed = flow * (0.7 + 0.8 * flow_shares[seg_id]) * ROLE_SPEED_SCALE[role_id, on_faulty.astype(np.intp)]
+        direction = np.where(on_faulty & (reflux_direction < 0), -1.0, 1.0)
+        speed = np.maximum(0.05, base_speed + rng.uniform(-noise, noise, size=len(role_id)))
+        t = agents["t"]
+        t += (speed / seg_lengths[seg_id] * direction).astype(np.float32)
+
+        wrapped = (t > 1.0) | (t < 0.0)
+        if wrapped.any():
+            from_trunk = wrapped & (seg_id == 0)
+            branch_cum = branch_cumulative_weights(flow_shares, segments, segments[2].beacon * 0.8)
+            seg_id[from_trunk] = choose_branches(branch_cum[role_id[from_trunk]], rng)
+            seg_id[wrapped & ~from_trunk] = 0
+            t[wrapped] = np.where(direction[wrapped] > 0, 0.0, 1.0)
 
         if phase_label == "Temporary Plug":
             if plug_state in ("inactive", "forming") and worker_on_faulty >= worker_threshold:
@@ -448,14 +488,14 @@ def create_flow_redirection_simulation(
                 plug_progress = clamp(plug_progress - 0.006, 0.0, 1.0)
 
         if plug_state == "active":
-            plug_timer -= 1.0 / fps
+            plug_timer -= dt
             if plug_timer <= 0 or phase_label == "Remodeling":
                 plug_state = "dissolving"
                 plug_timer = plug_dissolve_time
 
         if plug_state == "dissolving":
-            plug_progress = clamp(plug_progress - 1.0 / (plug_dissolve_time * fps), 0.0, 1.0)
-            plug_timer -= 1.0 / fps
+            plug_progress = clamp(plug_progress - dissolve_rate, 0.0, 1.0)
+            plug_timer -= dt
             if plug_progress <= 0.0:
                 plug_state = "inactive"
                 plug_timer = 0.0
@@ -465,26 +505,28 @@ def create_flow_redirection_simulation(
                 faulty_seg.valve_competence + 0.0008 * repair_on_faulty, 0.0, 1.0
             )
 
-        for seg_id, tracer_list in tracers.items():
-            target_flow = flow_shares.get(seg_id, 0.3) if seg_id != 0 else 1.0
+        if no_render:
+            continue
+
+        for seg in segments:
+            seg_id = seg.seg_id
+            target_flow = flow_shares[seg_id]
             desired_count = int(8 + target_flow * 22)
             if seg_id == 2 and plug_progress > 0.6:
                 desired_count = max(4, int(desired_count * (1.0 - plug_progress)))
-            current_count = len(tracer_list)
+            current_count = tracer_n[seg_id]
             if current_count < desired_count:
-                tracer_list.extend([rng.random() for _ in range(desired_count - current_count)])
-            elif current_count > desired_count:
-                del tracer_list[desired_count:]
+                tracer_buf[seg_id, current_count:desired_count] = tracer_rng.random(
+                    desired_count - current_count, dtype=np.float32
+                )
+            tracer_n[seg_id] = desired_count
 
             speed = 0.004 + target_flow * 0.006
             direction = reflux_direction if seg_id == 2 else 1
-            for idx, t in enumerate(tracer_list):
-                t += speed * direction
-                if t > 1.0:
-                    t = 0.0
-                elif t < 0.0:
-                    t = 1.0
-                tracer_list[idx] = t
+            tracer_t = tracer_buf[seg_id, :desired_count]
+            tracer_t += speed * direction
+            tracer_t[tracer_t > 1.0] = 0.0
+            tracer_t[tracer_t < 0.0] = 1.0
 
         mapped_percent = sum(seg.mapping for seg in segments) / len(segments) * 100.0
         reflux_percent = faulty_seg.reflux * 100.0
@@ -501,7 +543,7 @@ def create_flow_redirection_simulation(
         elif plug_state == "dissolving":
             plug_text = f"dissolving {plug_progress:0.2f}"
 
-        counts = role_counts(agents)
+        counts = role_counts(agents["role_id"])
         status_lines = [
             (f"Time {time_sec:4.1f}s", (20, 20, 20)),
             (f"Phase: {phase_label}", (20, 80, 20) if phase_label != "Baseline" else (80, 60, 20)),
@@ -523,11 +565,12 @@ def create_flow_redirection_simulation(
         ]
 
         frame = render_frame(
-            width,
-            height,
+            frame_buf,
+            frame_draw,
             segments,
             agents,
-            tracers,
+            tracer_buf,
+            tracer_n,
             flow_shares,
             reflux_direction,
             plug_progress,
@@ -542,13 +585,16 @@ def create_flow_redirection_simulation(
             frame_path = os.path.join(frame_dir, f"frame_{frame_idx:04d}.png")
             frame.save(frame_path)
 
-        frames.append(frame)
+        writer.append_data(np.asarray(frame))
 
-    print(f"Generated {len(frames)} frames for flow redirection simulation", flush=True)
-    print(f"Saving video to {video_path}...", flush=True)
-    imageio.mimsave(video_path, frames, fps=fps)
+    if no_render:
+        video_path = None
+        print(f"Simulated {num_frames} frames for flow redirection simulation (rendering skipped)", flush=True)
+    else:
+        writer.close()
+        print(f"Generated {num_frames} frames for flow redirection simulation", flush=True)
 
-    final_flow_shares = compute_flow_shares(segments, plug_progress)
+    final_flow_shares = compute_flow_shares(segments, plug_progress, faulty_idx)
     print("Flow redirection summary:", flush=True)
     print(f"  Final reflux severity: {segments[2].reflux * 100.0:.1f}%", flush=True)
     print(f"  Final pooling: {segments[2].pooling * 100.0:.1f}%", flush=True)
@@ -558,10 +604,31 @@ def create_flow_redirection_simulation(
         f"{final_flow_shares[2] * 100.0:.1f}%",
         flush=True,
     )
-    print(f"Video saved: {video_path}", flush=True)
+    if video_path:
+        print(f"Video saved: {video_path}", flush=True)
     return video_path
 
 
+def run_batch(seeds, max_workers=None, **kwargs):
+    """Run one simulation per seed in parallel worker processes.
+
+    Each seed writes its own outputs (suffixed with ``_seed{N}``). Returns a
+    dict mapping seed to the video path (None when rendering is skipped).
+    """
+    max_workers = max_workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            seed: executor.submit(
+                create_flow_redirection_simulation,
+                seed=seed,
+                output_tag=f"_seed{seed}",
+                **kwargs,
+            )
+            for seed in seeds
+        }
+        return {seed: future.result() for seed, future in futures.items()}
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Flow redirection swarm simulation runner")
     parser.add_argument("--swarm_size", type=int, default=200)
@@ -572,18 +639,27 @@ def parse_args():
     parser.add_argument("--fps", type=int, default=30)
     parser.add_argument("--seed", type=int, default=7)
     parser.add_argument("--save_frames", type=int, default=0, choices=[0, 1])
+    parser.add_argument("--no_render", type=int, default=0, choices=[0, 1])
+    parser.add_argument("--seeds", type=int, nargs="+", default=None,
+                        help="Run a batch over these seeds in parallel (overrides --seed)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Worker processes for --seeds (0 = all cores)")
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
-    create_flow_redirection_simulation(
+    sim_kwargs = dict(
         swarm_size=args.swarm_size,
         flow=args.flow,
         noise=args.noise,
         beacon_strength=args.beacon,
         duration_sec=args.duration_sec,
         fps=args.fps,
-        seed=args.seed,
         save_frames=args.save_frames,
+        no_render=args.no_render,
     )
+    if args.seeds:
+        run_batch(args.seeds, max_workers=args.workers or None, **sim_kwargs)
+    else:
+        create_flow_redirection_simulation(seed=args.seed, **sim_kwargs)
@@ -7,12 +7,37 @@ Simulates a nanobot detecting and clearing a varicose vein clog using:
 - Pressure/flow resistance detection
 """
 import os
+import copy
 import math
-from PIL import Image, ImageDraw
+import itertools
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import imageio
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Loaded once and shared by every text draw instead of per ImageDraw object
+UI_FONT = ImageFont.load_default()
+
+# Unit-circle direction tables for the fixed angle sets used when drawing
+_PLATELET_DIRS = [(math.cos(math.radians(a)), math.sin(math.radians(a))) for a in range(0, 360, 40)]
+_SENSOR_DOT_DIRS = [(math.cos(math.radians(a)), math.sin(math.radians(a))) for a in range(0, 360, 45)]
+
+# Sensor ring layout within a batch of sensor points: 8 viscosity, 4 optical,
+# 6 pressure. Each point reads the field of its ring (0 viscosity,
+# 1 reflectance, 2 resistance).
+_RING_SIZES = np.array([8, 4, 6])
+_RING_STARTS = np.array([0, 8, 12])
+_RING_FIELD = np.repeat(np.arange(3), _RING_SIZES)
+_RING_POINTS = np.arange(_RING_FIELD.size)
+
 
 class VeinSimulation:
     """Simulate blood vessel environment with realistic clog properties."""
     
+    # Normal blood readings: viscosity (cP), reflectance, flow resistance
+    BASELINE_READINGS = (4.5, 0.08, 1.0)
+    
     def __init__(self, width=900, height=650):
         self.width = width
         self.height = height
@@ -20,29 +45,80 @@ class VeinSimulation:
         self.vein_bottom = 450
         self.vein_center = (self.vein_top + self.vein_bottom) / 2
         
+        # Clog geometry and derived constants, fixed for the whole run
+        self.clog_center_x = 450
+        self.clog_center_y = int(self.vein_center)
+        self.clog_radius = 50
+        self.clog_influence_radius = self.clog_radius * 1.5  # beyond this readings are baseline
+        self._near_dist2 = self.clog_influence_radius**2
+        self._inv_scale_visc = np.float32(1.0 / (self.clog_radius * 0.7))
+        self._inv_scale_refl = np.float32(1.0 / (self.clog_radius * 0.6))
+        self._inv_scale_res = np.float32(1.0 / (self.clog_radius * 0.8))
+        
+        # Lookup grids of the three fields over the clog's influence window at
+        # one node per pixel, so integer sensor cells index them directly.
+        # Outside the window every field is at its baseline, which the grid's
+        # outer ring also holds; cells beyond it clamp onto that ring.
+        self.lut_stride = 1
+        half = int(math.ceil(self.clog_influence_radius)) + 2 * self.lut_stride
+        self._lut_x0 = self.clog_center_x - half
+        self._lut_y0 = self.clog_center_y - half
+        self._lut_n = n = 2 * half // self.lut_stride + 1
+        grid_x = self._lut_x0 + self.lut_stride * np.arange(n)
+        grid_y = self._lut_y0 + self.lut_stride * np.arange(n)
+        self.field_grids = np.stack(self.sample_all(grid_x[None, :], grid_y[:, None]))
+        self.viscosity_grid, self.reflectance_grid, self.resistance_grid = self.field_grids
+        
+    def sample_all(self, x, y):
+        """
+        Evaluate viscosity, reflectance and flow resistance in one pass.
+        The distance to the clog is computed once and shared by all three
+        modalities; sqrt/exp only run for points inside the clog's influence.
+        Accepts scalars or NumPy arrays of sensor coordinates.
+        """
+        # Single precision is ample for display thresholds and doubles SIMD throughput
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=np.float32), np.asarray(y, dtype=np.float32))
+        dist2 = (x - np.float32(self.clog_center_x))**2 + (y - np.float32(self.clog_center_y))**2
+        near = dist2 < self._near_dist2
+        neg_dist = -np.sqrt(dist2[near])
+        
+        # Baselines: normal blood viscosity 4.5 cP, reflectance 8%, resistance 1.0
+        viscosity = np.full(x.shape, 4.5, dtype=np.float32)
+        reflectance = np.full(x.shape, 0.08, dtype=np.float32)
+        resistance = np.full(x.shape, 1.0, dtype=np.float32)
+        
+        # Gradients rise towards the clog (fibrin, platelets accumulation)
+        viscosity[near] += 45 * np.exp(neg_dist * self._inv_scale_visc, dtype=np.float32)
+        reflectance[near] += 0.85 * np.exp(neg_dist * self._inv_scale_refl, dtype=np.float32)
+        resistance[near] += 95 * np.exp(neg_dist * self._inv_scale_res, dtype=np.float32)
+        return viscosity, reflectance, resistance
+    
+    def sense_rings(self, x, y, radius, cell_dx, cell_dy):
+        """
+        Average each modality over a nanobot's 8/4/6 sensor rings centred at (x, y).
+        Sensors sit at integer cell offsets (cell_dx, cell_dy) from the bot's
+        pixel, so each reading is a direct grid load.
+        Returns an array of (viscosity, reflectance, resistance).
+        """
+        # Bounding check: if even the outermost ring (2x radius) cannot reach the
+        # clog's influence, every sensor reads baseline and sampling is skipped
+        reach = 2.0 * radius + self.clog_influence_radius
+        if (x - self.clog_center_x)**2 + (y - self.clog_center_y)**2 > reach * reach:
+            return np.array(self.BASELINE_READINGS)
+        # Cells beyond the window clamp onto its baseline border
+        last = self._lut_n - 1
+        cols = np.clip(int(x) - self._lut_x0 + cell_dx, 0, last)
+        rows = np.clip(int(y) - self._lut_y0 + cell_dy, 0, last)
+        samples = self.field_grids[_RING_FIELD, rows, cols]
+        return np.add.reduceat(samples, _RING_STARTS) / _RING_SIZES
+    
     def get_viscosity_at_position(self, x, y):
         """
         Calculate blood viscosity at position.
         Normal blood viscosity: ~4-5 cP
         Clotted blood viscosity: ~20-50+ cP
         """
-        clog_center_x = 450
-        clog_center_y = int(self.vein_center)
-        clog_radius = 50
-        
-        # Distance from clog center
-        dist = math.sqrt((x - clog_center_x)**2 + (y - clog_center_y)**2)
-        
-        # Base viscosity of normal blood
-        normal_viscosity = 4.5
-        
-        # Increased viscosity near clog (fibrin, platelets accumulation)
-        if dist < clog_radius * 1.5:
-            # Gradient: higher viscosity closer to clog
-            viscosity_increase = 45 * math.exp(-dist / (clog_radius * 0.7))
-            return normal_viscosity + viscosity_increase
-        
-        return normal_viscosity
+        return self.sample_all(x, y)[0]
     
     def get_optical_reflectance(self, x, y):
         """
@@ -50,21 +126,7 @@ class VeinSimulation:
         Normal blood: low reflectance (darker)
         Clot: high reflectance (fibrin matrix is denser, more reflective)
         """
-        clog_center_x = 450
-        clog_center_y = int(self.vein_center)
-        clog_radius = 50
-        
-        dist = math.sqrt((x - clog_center_x)**2 + (y - clog_center_y)**2)
-        
-        # Normal blood reflectance: 5-10%
-        base_reflectance = 0.08
-        
-        # Clot reflectance increases with proximity
-        if dist < clog_radius * 1.5:
-            reflectance_increase = 0.85 * math.exp(-dist / (clog_radius * 0.6))
-            return base_reflectance + reflectance_increase
-        
-        return base_reflectance
+        return self.sample_all(x, y)[1]
     
     def get_flow_resistance(self, x, y):
         """
@@ -72,29 +134,35 @@ class VeinSimulation:
         Normal flow resistance: ~1.0
         Blocked flow resistance: 10-100+
         """
-        clog_center_x = 450
-        clog_center_y = int(self.vein_center)
-        clog_radius = 50
-        
-        dist = math.sqrt((x - clog_center_x)**2 + (y - clog_center_y)**2)
-        
-        base_resistance = 1.0
-        
-        if dist < clog_radius * 1.5:
-            resistance_increase = 95 * math.exp(-dist / (clog_radius * 0.8))
-            return base_resistance + resistance_increase
-        
-        return base_resistance
+        return self.sample_all(x, y)[2]
 
 
 class Nanobot:
     """Represents a nanobot with sensing capabilities."""
     
+    # All sensor rings in one batch, computed once for all frames:
+    # 8 viscosity sensors at 1.0x radius, 4 optical at 1.5x, 6 pressure at 2.0x
+    _SENSOR_ANGLES = np.deg2rad(np.concatenate([
+        np.arange(0, 360, 45), np.arange(0, 360, 90), np.arange(0, 360, 60)
+    ]))
+    _SENSOR_SCALE = np.repeat([1.0, 1.5, 2.0], [8, 4, 6])
+    _SENSOR_DX = _SENSOR_SCALE * np.cos(_SENSOR_ANGLES)
+    _SENSOR_DY = _SENSOR_SCALE * np.sin(_SENSOR_ANGLES)
+    
+    # Signal normalization per modality (viscosity, reflectance, resistance)
+    _SIGNAL_OFFSET = np.array([4.5, 0.0, 1.0])
+    _SIGNAL_RANGE = np.array([45.0, 0.85, 95.0])
+    _POSITIONS = ('normal_blood', 'near_clog', 'CLOG_DETECTED')
+    
     def __init__(self, x=50, y=325):
         self.x = x
         self.y = y
         self.radius = 18
         
+        # Sensor positions as integer pixel offsets from the bot
+        self.sensor_cell_dx = np.rint(self.radius * self._SENSOR_DX).astype(np.intp)
+        self.sensor_cell_dy = np.rint(self.radius * self._SENSOR_DY).astype(np.intp)
+        
         # Sensing arrays
         self.viscosity_sensors = 8  # Distributed around the nanobot
         self.optical_sensors = 4
@@ -112,41 +180,14 @@ class Nanobot:
     
     def sense_environment(self, vein_sim, frame_idx):
         """Use multiple sensor arrays to detect clog."""
-        # Sample viscosity from multiple angles
-        viscosity_samples = []
-        for angle in range(0, 360, 45):  # 8 sensors
-            rad = math.radians(angle)
-            sensor_x = self.x + self.radius * math.cos(rad)
-            sensor_y = self.y + self.radius * math.sin(rad)
-            visc = vein_sim.get_viscosity_at_position(sensor_x, sensor_y)
-            viscosity_samples.append(visc)
-        
-        avg_viscosity = sum(viscosity_samples) / len(viscosity_samples)
-        viscosity_signal = min(1.0, (avg_viscosity - 4.5) / 45.0)  # Normalize 0-1
-        
-        # Sample optical reflectance
-        reflectance_samples = []
-        for angle in range(0, 360, 90):  # 4 sensors
-            rad = math.radians(angle)
-            sensor_x = self.x + self.radius * 1.5 * math.cos(rad)
-            sensor_y = self.y + self.radius * 1.5 * math.sin(rad)
-            refl = vein_sim.get_optical_reflectance(sensor_x, sensor_y)
-            reflectance_samples.append(refl)
-        
-        avg_reflectance = sum(reflectance_samples) / len(reflectance_samples)
-        reflectance_signal = min(1.0, avg_reflectance / 0.85)  # Normalize
-        
-        # Sample flow resistance
-        resistance_samples = []
-        for angle in range(0, 360, 60):  # 6 sensors
-            rad = math.radians(angle)
-            sensor_x = self.x + self.radius * 2.0 * math.cos(rad)
-            sensor_y = self.y + self.radius * 2.0 * math.sin(rad)
-            res = vein_sim.get_flow_resistance(sensor_x, sensor_y)
-            resistance_samples.append(res)
-        
-        avg_resistance = sum(resistance_samples) / len(resistance_samples)
-        resistance_signal = min(1.0, (avg_resistance - 1.0) / 95.0)  # Normalize
+        # Sample all three sensor rings in one grid lookup
+        readings = vein_sim.sense_rings(
+            self.x, self.y, self.radius, self.sensor_cell_dx, self.sensor_cell_dy
+        )
+        # Normalize each modality to 0-1 against its clog contrast
+        signals = np.minimum(1.0, (readings - self._SIGNAL_OFFSET) / self._SIGNAL_RANGE)
+        avg_viscosity, avg_reflectance, avg_resistance = readings.tolist()
+        viscosity_signal, reflectance_signal, resistance_signal = signals.tolist()
         
         # Combine sensor signals (multi-modal detection)
         self.detection_data = {
@@ -158,29 +199,16 @@ class Nanobot:
             'resistance_signal': resistance_signal,
         }
         
-        # Clog detection threshold: if multiple sensors exceed threshold
+        # Clog detection threshold: require at least 2 sensors to trigger
+        # (detection latches once triggered)
         threshold = 0.3
-        signal_count = sum([
-            viscosity_signal > threshold,
-            reflectance_signal > threshold,
-            resistance_signal > threshold
-        ])
-        
-        # Require at least 2 sensors to trigger clog detection
-        if signal_count >= 2:
-            self.clog_detected = True
-            # Combined signal strength
-            self.clog_signal_strength = (viscosity_signal + reflectance_signal + resistance_signal) / 3.0
-        else:
-            self.clog_signal_strength = max(viscosity_signal, reflectance_signal, resistance_signal)
+        multi_modal = int((signals > threshold).sum()) >= 2
+        self.clog_detected = self.clog_detected or multi_modal
+        # Combined signal strength when fused, else the strongest single sensor
+        self.clog_signal_strength = float(signals.mean() if multi_modal else signals.max())
         
-        # Determine position type
-        if avg_resistance > 20:
-            self.detection_data['position'] = 'CLOG_DETECTED'
-        elif avg_resistance > 5:
-            self.detection_data['position'] = 'near_clog'
-        else:
-            self.detection_data['position'] = 'normal_blood'
+        # Determine position type from flow resistance buckets
+        self.detection_data['position'] = self._POSITIONS[(avg_resistance > 5) + (avg_resistance > 20)]
 
 
 def draw_blood_cells(draw, x, y, size, color_variation=0):
@@ -191,10 +219,246 @@ def draw_blood_cells(draw, x, y, size, color_variation=0):
     draw.ellipse(bbox, fill=cell_color, outline=(150, 30, 30))
 
 
-def create_advanced_simulation():
-    """Create biologically realistic nanobot simulation."""
-    import imageio
+def render_template(vein_sim):
+    """
+    Pre-render every frame-invariant pixel: blood plasma, vein walls, the title
+    text and the empty sensor and progress bar outlines.
+    """
+    bg = np.empty((vein_sim.height, vein_sim.width, 3), dtype=np.uint8)
+    bg[:] = (255, 240, 240)
+    # Vein walls (endothelium); row ranges match PIL's inclusive rectangle bounds
+    bg[vein_sim.vein_top - 10:vein_sim.vein_top + 1] = (100, 100, 150)
+    bg[vein_sim.vein_bottom:vein_sim.vein_bottom + 11] = (100, 100, 150)
+    
+    template = Image.fromarray(bg)
+    draw = ImageDraw.Draw(template)
+    
+    # Title and description
+    draw.text((20, 15), "Biological Clog Detection - Multi-Modal Sensing", fill=(0, 0, 0), font=UI_FONT)
+    draw.text((20, 35), "Viscosity | Optical | Flow Resistance", fill=(60, 60, 60), font=UI_FONT)
+    
+    # Viscosity, optical and flow resistance bar outlines
+    for bar_y in (60, 80, 100):
+        draw.rectangle([20, bar_y, 20 + SENSOR_BAR_WIDTH, bar_y + SENSOR_BAR_HEIGHT], outline=(100, 100, 100))
+    
+    # Progress indicator outline
+    draw.rectangle([20, vein_sim.height - 20, 20 + PROGRESS_BAR_WIDTH, vein_sim.height - 10],
+                  outline=(100, 100, 100))
+    return template
+
+
+def render_clog_patch(vein_sim):
+    """
+    Pre-render the clog (thrombus) as an opaque patch.
+    Returns the patch image and the box it is pasted to each frame, so the
+    clog still draws over the blood cells that pass behind it.
+    """
+    clog_center_x = vein_sim.clog_center_x
+    clog_center_y = vein_sim.clog_center_y
+    clog_radius = vein_sim.clog_radius
+    box = (clog_center_x - clog_radius, clog_center_y - clog_radius,
+           clog_center_x + clog_radius + 1, clog_center_y + clog_radius + 1)
+    
+    img = Image.new('RGB', (vein_sim.width, vein_sim.height))
+    draw = ImageDraw.Draw(img)
+    
+    # Draw fibrin matrix (network structure)
+    draw.rectangle([clog_center_x - clog_radius, clog_center_y - clog_radius,
+                   clog_center_x + clog_radius, clog_center_y + clog_radius],
+                  fill=(220, 80, 80), outline=(150, 0, 0), width=3)  # Darker, opaque clot
+    
+    # Draw platelets in clot
+    for cos_a, sin_a in _PLATELET_DIRS:
+        platelet_x = clog_center_x + (clog_radius * 0.6) * cos_a
+        platelet_y = clog_center_y + (clog_radius * 0.6) * sin_a
+        draw.ellipse([platelet_x - 4, platelet_y - 4, platelet_x + 4, platelet_y + 4],
+                    fill=(180, 40, 40))
+    
+    return img.crop(box), box[:2]
+
+
+def blood_cell_lanes(vein_sim, count=20):
+    """
+    Frame-invariant blood cell layout: x offsets (shifted by frame index each
+    frame) and y positions, pre-filtered to cells inside the vein.
+    """
+    idx = np.arange(count)
+    cell_dx = idx * 50
+    cell_y = vein_sim.vein_center + (idx % 3 - 1) * 30
+    inside = (vein_sim.vein_top < cell_y) & (cell_y < vein_sim.vein_bottom)
+    return cell_dx[inside], cell_y[inside].tolist()
+
+
+# Nanobot sprites: large enough for the glow ring plus a sub-pixel shift. The
+# centre offset is even so PIL's round-half-to-even sees the same parity in the
+# sprite as on the frame.
+NANOBOT_SPRITE_SIZE = 66
+NANOBOT_SPRITE_CENTER = 32
+
+
+@lru_cache(maxsize=1024)
+def nanobot_sprite(radius, glow_intensity, detected, frac_x, frac_y):
+    """
+    Render the nanobot (glow, body and sensor points) onto a transparent sprite.
+    The body is centred at the sprite's middle plus the sub-pixel offset
+    (frac_x, frac_y), so pasting at an integer position reproduces the exact
+    rasterization of drawing at the nanobot's float coordinates.
+    """
+    sprite = Image.new('RGBA', (NANOBOT_SPRITE_SIZE, NANOBOT_SPRITE_SIZE), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite)
+    x = NANOBOT_SPRITE_CENTER + frac_x
+    y = NANOBOT_SPRITE_CENTER + frac_y
+    
+    glow_radius = radius + 12
+    glow_color = (100 + glow_intensity, 180, 255)
+    
+    glow_bbox = [x - glow_radius, y - glow_radius, x + glow_radius, y + glow_radius]
+    draw.ellipse(glow_bbox, fill=glow_color, outline=(100, 150, 255), width=1)
+    
+    # Main nanobot body (changes color based on detection)
+    if detected:
+        bot_color = (255, 150, 50)  # Orange when detecting clog
+        bot_outline = (200, 100, 0)
+    else:
+        bot_color = (50, 100, 200)  # Blue in normal mode
+        bot_outline = (0, 50, 150)
+    
+    bot_bbox = [x - radius, y - radius, x + radius, y + radius]
+    draw.ellipse(bot_bbox, fill=bot_color, outline=bot_outline, width=2)
+    
+    # Draw sensor points
+    for cos_a, sin_a in _SENSOR_DOT_DIRS:
+        sensor_x = x + (radius + 6) * cos_a
+        sensor_y = y + (radius + 6) * sin_a
+        draw.ellipse([sensor_x - 2, sensor_y - 2, sensor_x + 2, sensor_y + 2],
+                    fill=(255, 200, 0))  # Yellow sensor points
+    
+    return sprite
+
+
+# Layout of the sensor readout bars and the progress indicator
+SENSOR_BAR_WIDTH = 200
+SENSOR_BAR_HEIGHT = 15
+PROGRESS_BAR_WIDTH = 400
+
+# Per-process static layers for render_frame, built on first use
+_render_state = {}
+
+
+def _static_layers():
+    if not _render_state:
+        vein_sim = VeinSimulation(width=900, height=650)
+        clog_patch, clog_pos = render_clog_patch(vein_sim)
+        _render_state.update(
+            vein_sim=vein_sim,
+            cell_lanes=blood_cell_lanes(vein_sim),
+            template=render_template(vein_sim),
+            clog_patch=clog_patch,
+            clog_pos=clog_pos,
+        )
+    return _render_state
+
+
+def render_frame(frame_idx, nanobot, num_frames):
+    """
+    Draw one frame from a snapshot of the nanobot's sensed state.
+    Has no shared mutable state, so frames can be rendered in worker processes.
+    Returns the frame as an RGB uint8 array.
+    """
+    state = _static_layers()
+    vein_sim = state['vein_sim']
+    template = state['template']
+    clog_patch, clog_pos = state['clog_patch'], state['clog_pos']
+    cell_dx, cell_ys = state['cell_lanes']
+    
+    # Start from a copy of the pre-rendered background, walls, titles and bar outlines
+    img = template.copy()
+    draw = ImageDraw.Draw(img)
+    
+    # === Draw blood cells (background) ===
+    cell_xs = (frame_idx + cell_dx) % vein_sim.width
+    for cell_x, cell_y in zip(cell_xs.tolist(), cell_ys):
+        draw_blood_cells(draw, cell_x, cell_y, 4)
+    
+    # === Draw clog (thrombus) with realistic structure ===
+    img.paste(clog_patch, clog_pos)
     
+    # === Draw nanobot ===
+    # Nanobot glow intensity based on detection; the sprite is cached per look
+    glow_intensity = int(nanobot.clog_signal_strength * 200)
+    frac_x, frac_y = nanobot.x % 1, nanobot.y % 1
+    sprite = nanobot_sprite(nanobot.radius, glow_intensity, nanobot.clog_detected, frac_x, frac_y)
+    img.paste(sprite, (int(nanobot.x - frac_x) - NANOBOT_SPRITE_CENTER,
+                       int(nanobot.y - frac_y) - NANOBOT_SPRITE_CENTER), sprite)
+    
+    # === Display sensor data ===
+    progress = frame_idx / num_frames
+    
+    # Sensor readings as bars (outlines are part of the template)
+    bar_y = 60
+    bar_height = SENSOR_BAR_HEIGHT
+    bar_width = SENSOR_BAR_WIDTH
+    
+    # Viscosity bar
+    visc_fill = int(nanobot.detection_data['viscosity_signal'] * bar_width)
+    if visc_fill > 0:
+        draw.rectangle([20, bar_y, 20 + visc_fill, bar_y + bar_height], 
+                      fill=(255, 100, 100))  # Red for viscosity
+    draw.text((230, bar_y), f"Viscosity: {nanobot.detection_data['viscosity']:.1f} cP", fill=(0, 0, 0), font=UI_FONT)
+    
+    # Optical bar
+    bar_y += 20
+    opt_fill = int(nanobot.detection_data['reflectance_signal'] * bar_width)
+    if opt_fill > 0:
+        draw.rectangle([20, bar_y, 20 + opt_fill, bar_y + bar_height], 
+                      fill=(100, 150, 255))  # Blue for optical
+    draw.text((230, bar_y), f"Reflectance: {nanobot.detection_data['reflectance']:.3f}", fill=(0, 0, 0), font=UI_FONT)
+    
+    # Flow Resistance bar
+    bar_y += 20
+    res_fill = int(nanobot.detection_data['resistance_signal'] * bar_width)
+    if res_fill > 0:
+        draw.rectangle([20, bar_y, 20 + res_fill, bar_y + bar_height], 
+                      fill=(100, 200, 100))  # Green for resistance
+    draw.text((230, bar_y), f"Flow Resistance: {nanobot.detection_data['resistance']:.1f}", fill=(0, 0, 0), font=UI_FONT)
+    
+    # Position status
+    status_text = f"Position: {nanobot.detection_data['position']}"
+    status_color = (255, 100, 0) if nanobot.clog_detected else (0, 100, 0)
+    draw.text((20, bar_y + 30), status_text, fill=status_color, font=UI_FONT)
+    
+    # Combined signal strength
+    draw.text((20, bar_y + 50), 
+             f"Combined Signal: {nanobot.clog_signal_strength:.2f} / 1.0", 
+             fill=(0, 0, 0), font=UI_FONT)
+    
+    # Overall status
+    if nanobot.clog_detected:
+        status = "🔴 CLOG DETECTED - Activating clearance protocol"
+        msg_color = (255, 0, 0)
+    elif nanobot.clog_signal_strength > 0.2:
+        status = "🟡 CLOG APPROACHING - Sensors increasing sensitivity"
+        msg_color = (255, 150, 0)
+    else:
+        status = "🟢 Normal blood - No blockage detected"
+        msg_color = (0, 150, 0)
+    
+    draw.text((20, vein_sim.height - 50), status, fill=msg_color, font=UI_FONT)
+    
+    # Progress indicator
+    draw.rectangle([20, vein_sim.height - 20, 20 + int(progress * PROGRESS_BAR_WIDTH), vein_sim.height - 10],
+                  fill=(100, 200, 100))
+    
+    return np.asarray(img)
+
+
+def create_advanced_simulation(workers=None):
+    """
+    Create biologically realistic nanobot simulation.
+    Sensing runs sequentially (detection latches across frames); the frames
+    themselves are rendered in parallel by `workers` processes (default: all
+    cores, 1 renders in-process).
+    """
     OUTPUT_DIR = "c:\\Sansten\\vRobot\\outputs"
     VIDEO_PATH = os.path.join(OUTPUT_DIR, "nanobot_sim_biological.mp4")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -204,154 +468,31 @@ def create_advanced_simulation():
     vein_sim = VeinSimulation(width=900, height=650)
     nanobot = Nanobot()
     
-    frames = []
     num_frames = 300
     
+    # Frames are streamed to the encoder as they are drawn instead of being held in memory
+    print(f"Writing video to {VIDEO_PATH}...", flush=True)
+    writer = imageio.get_writer(VIDEO_PATH, fps=30, codec='libx264', macro_block_size=1)
+    
+    # Sense along the trajectory first and snapshot the nanobot for each frame
+    snapshots = []
     for frame_idx in range(num_frames):
-        # Create background
-        img = Image.new('RGB', (vein_sim.width, vein_sim.height), color=(255, 240, 240))
-        draw = ImageDraw.Draw(img)
-        
-        # === Draw vein structure ===
-        # Vein walls (more realistic)
-        draw.rectangle([0, vein_sim.vein_top - 10, vein_sim.width, vein_sim.vein_top], 
-                      fill=(100, 100, 150))  # Endothelium
-        draw.rectangle([0, vein_sim.vein_bottom, vein_sim.width, vein_sim.vein_bottom + 10], 
-                      fill=(100, 100, 150))
-        
-        # === Draw blood cells (background) ===
-        import random
-        random.seed(frame_idx // 5)  # Stable but changing
-        for i in range(20):
-            cell_x = (frame_idx + i * 50) % vein_sim.width
-            cell_y = vein_sim.vein_center + (i % 3 - 1) * 30
-            if vein_sim.vein_top < cell_y < vein_sim.vein_bottom:
-                draw_blood_cells(draw, cell_x, cell_y, 4)
-        
-        # === Draw clog (thrombus) with realistic structure ===
-        clog_center_x = 450
-        clog_center_y = int(vein_sim.vein_center)
-        clog_radius = 50
-        
-        # Draw fibrin matrix (network structure)
-        draw.rectangle([clog_center_x - clog_radius, clog_center_y - clog_radius,
-                       clog_center_x + clog_radius, clog_center_y + clog_radius],
-                      fill=(220, 80, 80), outline=(150, 0, 0), width=3)  # Darker, opaque clot
-        
-        # Draw platelets in clot
-        for offset_angle in range(0, 360, 40):
-            rad = math.radians(offset_angle)
-            platelet_x = clog_center_x + (clog_radius * 0.6) * math.cos(rad)
-            platelet_y = clog_center_y + (clog_radius * 0.6) * math.sin(rad)
-            draw.ellipse([platelet_x - 4, platelet_y - 4, platelet_x + 4, platelet_y + 4],
-                        fill=(180, 40, 40))
-        
-        # === Draw nanobot ===
         nanobot.x = 50 + frame_idx * 2.5
         nanobot.sense_environment(vein_sim, frame_idx)
-        
-        # Nanobot glow intensity based on detection
-        glow_intensity = int(nanobot.clog_signal_strength * 200)
-        glow_radius = nanobot.radius + 12
-        glow_color = (100 + glow_intensity, 180, 255)
-        
-        glow_bbox = [nanobot.x - glow_radius, nanobot.y - glow_radius,
-                    nanobot.x + glow_radius, nanobot.y + glow_radius]
-        draw.ellipse(glow_bbox, fill=glow_color, outline=(100, 150, 255), width=1)
-        
-        # Main nanobot body (changes color based on detection)
-        if nanobot.clog_detected:
-            bot_color = (255, 150, 50)  # Orange when detecting clog
-            bot_outline = (200, 100, 0)
-        else:
-            bot_color = (50, 100, 200)  # Blue in normal mode
-            bot_outline = (0, 50, 150)
-        
-        bot_bbox = [nanobot.x - nanobot.radius, nanobot.y - nanobot.radius,
-                   nanobot.x + nanobot.radius, nanobot.y + nanobot.radius]
-        draw.ellipse(bot_bbox, fill=bot_color, outline=bot_outline, width=2)
-        
-        # Draw sensor points
-        for angle in range(0, 360, 45):
-            rad = math.radians(angle)
-            sensor_x = nanobot.x + (nanobot.radius + 6) * math.cos(rad)
-            sensor_y = nanobot.y + (nanobot.radius + 6) * math.sin(rad)
-            draw.ellipse([sensor_x - 2, sensor_y - 2, sensor_x + 2, sensor_y + 2],
-                        fill=(255, 200, 0))  # Yellow sensor points
-        
-        # === Display sensor data ===
-        progress = frame_idx / num_frames
-        
-        # Title and description
-        draw.text((20, 15), "Biological Clog Detection - Multi-Modal Sensing", fill=(0, 0, 0))
-        draw.text((20, 35), "Viscosity | Optical | Flow Resistance", fill=(60, 60, 60))
-        
-        # Sensor readings as bars
-        bar_y = 60
-        bar_height = 15
-        bar_width = 200
-        
-        # Viscosity bar
-        draw.rectangle([20, bar_y, 20 + bar_width, bar_y + bar_height], outline=(100, 100, 100))
-        visc_fill = int(nanobot.detection_data['viscosity_signal'] * bar_width)
-        if visc_fill > 0:
-            draw.rectangle([20, bar_y, 20 + visc_fill, bar_y + bar_height], 
-                          fill=(255, 100, 100))  # Red for viscosity
-        draw.text((230, bar_y), f"Viscosity: {nanobot.detection_data['viscosity']:.1f} cP", fill=(0, 0, 0))
-        
-        # Optical bar
-        bar_y += 20
-        draw.rectangle([20, bar_y, 20 + bar_width, bar_y + bar_height], outline=(100, 100, 100))
-        opt_fill = int(nanobot.detection_data['reflectance_signal'] * bar_width)
-        if opt_fill > 0:
-            draw.rectangle([20, bar_y, 20 + opt_fill, bar_y + bar_height], 
-                          fill=(100, 150, 255))  # Blue for optical
-        draw.text((230, bar_y), f"Reflectance: {nanobot.detection_data['reflectance']:.3f}", fill=(0, 0, 0))
-        
-        # Flow Resistance bar
-        bar_y += 20
-        draw.rectangle([20, bar_y, 20 + bar_width, bar_y + bar_height], outline=(100, 100, 100))
-        res_fill = int(nanobot.detection_data['resistance_signal'] * bar_width)
-        if res_fill > 0:
-            draw.rectangle([20, bar_y, 20 + res_fill, bar_y + bar_height], 
-                          fill=(100, 200, 100))  # Green for resistance
-        draw.text((230, bar_y), f"Flow Resistance: {nanobot.detection_data['resistance']:.1f}", fill=(0, 0, 0))
-        
-        # Position status
-        status_text = f"Position: {nanobot.detection_data['position']}"
-        status_color = (255, 100, 0) if nanobot.clog_detected else (0, 100, 0)
-        draw.text((20, bar_y + 30), status_text, fill=status_color)
-        
-        # Combined signal strength
-        draw.text((20, bar_y + 50), 
-                 f"Combined Signal: {nanobot.clog_signal_strength:.2f} / 1.0", 
-                 fill=(0, 0, 0))
-        
-        # Overall status
-        if nanobot.clog_detected:
-            status = "🔴 CLOG DETECTED - Activating clearance protocol"
-            msg_color = (255, 0, 0)
-        elif nanobot.clog_signal_strength > 0.2:
-            status = "🟡 CLOG APPROACHING - Sensors increasing sensitivity"
-            msg_color = (255, 150, 0)
-        else:
-            status = "🟢 Normal blood - No blockage detected"
-            msg_color = (0, 150, 0)
-        
-        draw.text((20, vein_sim.height - 50), status, fill=msg_color)
-        
-        # Progress indicator
-        progress_bar_width = 400
-        draw.rectangle([20, vein_sim.height - 20, 20 + progress_bar_width, vein_sim.height - 10],
-                      outline=(100, 100, 100))
-        draw.rectangle([20, vein_sim.height - 20, 20 + int(progress * progress_bar_width), vein_sim.height - 10],
-                      fill=(100, 200, 100))
-        
-        frames.append(img)
+        snapshots.append(copy.copy(nanobot))
+    
+    # Static layers are rendered once per process; only moving elements are drawn per frame
+    frame_args = (range(num_frames), snapshots, itertools.repeat(num_frames))
+    if workers == 1:
+        for frame in map(render_frame, *frame_args):
+            writer.append_data(frame)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for frame in executor.map(render_frame, *frame_args, chunksize=16):
+                writer.append_data(frame)
     
-    print(f"Generated {len(frames)} frames with biological detection", flush=True)
-    print(f"Saving video to {VIDEO_PATH}...", flush=True)
-    imageio.mimsave(VIDEO_PATH, frames, fps=30)
+    writer.close()
+    print(f"Generated {num_frames} frames with biological detection", flush=True)
     print(f"✓ Advanced simulation saved: {VIDEO_PATH}", flush=True)
     return VIDEO_PATH
 
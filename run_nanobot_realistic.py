@@ -9,7 +9,105 @@ Includes:
 """
 import os
 import math
-from PIL import Image, ImageDraw
+from enum import IntEnum
+from functools import lru_cache
+import imageio
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from draw_utils import blit, fill_rect, sprite_arrays, draw_vein, draw_bot
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the kernels below run as plain Python.
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Sensor ring directions: viscosity every 45°, optical every 90°, resistance every 60°
+ANGLES_V = np.arange(0, 360, 45)
+ANGLES_O = np.arange(0, 360, 90)
+ANGLES_R = np.arange(0, 360, 60)
+COS_V, SIN_V = np.cos(np.deg2rad(ANGLES_V)), np.sin(np.deg2rad(ANGLES_V))
+COS_O, SIN_O = np.cos(np.deg2rad(ANGLES_O)), np.sin(np.deg2rad(ANGLES_O))
+COS_R, SIN_R = np.cos(np.deg2rad(ANGLES_R)), np.sin(np.deg2rad(ANGLES_R))
+
+# Loaded once and shared by every text draw
+FONT = ImageFont.load_default()
+
+# Unit-circle directions of the drawn sensor points
+_SENSOR_DOT_DIRS = [(math.cos(math.radians(a)), math.sin(math.radians(a))) for a in range(0, 360, 45)]
+
+
+class BotState(IntEnum):
+    """Nanobot state machine states."""
+    SEARCHING = 0
+    APPROACHING = 1
+    CLEARING = 2
+    CONTINUING = 3
+
+
+# HUD text colour for each state, indexed by BotState
+STATE_COLORS = ((0, 150, 0), (200, 150, 0), (255, 0, 0), (0, 100, 200))
+
+
+@njit(cache=True)
+def step_physics(state, velocity, x, target_x, max_v, max_a):
+    """
+    One frame of nanobot motion for a BotState value (as int).
+    Returns the new (velocity, x, acceleration).
+    """
+    acceleration = 0.0
+    if state == 0:  # SEARCHING
+        # Normal searching: accelerate toward target if below max velocity
+        if target_x - x > 0 and velocity < max_v:
+            acceleration = max_a
+    elif state == 1:  # APPROACHING
+        # Approaching clog: decelerate for precision
+        desired_vel = 1.0  # Slower approach
+        if velocity > desired_vel:
+            acceleration = -max_a * 0.8  # Gentle deceleration
+        elif velocity < desired_vel:
+            acceleration = max_a * 0.5
+    elif state == 2:  # CLEARING
+        # Stop completely while clearing
+        acceleration = -velocity * 0.3  # Friction to stop
+        if abs(velocity) < 0.05:
+            velocity = 0.0
+            acceleration = 0.0
+    elif state == 3:  # CONTINUING
+        # Resume after clearing: accelerate smoothly
+        if velocity < max_v:
+            acceleration = max_a
+    
+    # Apply physics: v = v + a, clamped; x = x + v
+    velocity += acceleration
+    velocity = max(-max_v, min(max_v, velocity))
+    return velocity, x + velocity, acceleration
+
+
+@njit(cache=True)
+def _field(x, centers, densities, cleared, base, coef, radius=80.0):
+    """Clog field at one x: base plus the strongest uncleared clog's linear rise."""
+    max_increase = 0.0
+    for i in range(centers.shape[0]):
+        if cleared[i]:
+            continue
+        proximity = 1.0 - abs(x - centers[i]) / radius
+        if proximity > 0.0:
+            max_increase = max(max_increase, coef * densities[i] * proximity)
+    return base + max_increase
+
+
+@njit(cache=True)
+def _field_many(xs, centers, densities, cleared, base, coef):
+    """Evaluate _field for every sensor x in one compiled call."""
+    out = np.empty(xs.shape[0])
+    for j in range(xs.shape[0]):
+        out[j] = _field(xs[j], centers, densities, cleared, base, coef)
+    return out
+
 
 class RealisticNanobot:
     """
@@ -29,7 +127,7 @@ class RealisticNanobot:
         self.max_acceleration = 0.15  # pixels/frame² (realistic for microbot)
         
         # State machine
-        self.state = "SEARCHING"  # SEARCHING, APPROACHING, CLEARING, CONTINUING
+        self.state = BotState.SEARCHING
         self.target_reached = False
         
         # Sensing
@@ -50,41 +148,33 @@ class RealisticNanobot:
             'reflectance': 0.08,
             'resistance': 1.0,
         }
+        self.visc_signal = 0.0
+        self.refl_signal = 0.0
+        self.res_signal = 0.0
     
     def update_sensors(self, vein_sim, frame_idx):
         """Update sensor readings from environment."""
-        # Viscosity sensing
-        visc_samples = []
-        for angle in range(0, 360, 45):
-            rad = math.radians(angle)
-            sensor_x = self.x + self.radius * math.cos(rad)
-            sensor_y = self.y + self.radius * math.sin(rad)
-            visc = vein_sim.get_viscosity_at_position(sensor_x, sensor_y)
-            visc_samples.append(visc)
-        
-        avg_viscosity = sum(visc_samples) / len(visc_samples)
-        
-        # Optical sensing
-        refl_samples = []
-        for angle in range(0, 360, 90):
-            rad = math.radians(angle)
-            sensor_x = self.x + self.radius * 1.5 * math.cos(rad)
-            sensor_y = self.y + self.radius * 1.5 * math.sin(rad)
-            refl = vein_sim.get_optical_reflectance(sensor_x, sensor_y)
-            refl_samples.append(refl)
-        
-        avg_reflectance = sum(refl_samples) / len(refl_samples)
-        
-        # Resistance sensing
-        res_samples = []
-        for angle in range(0, 360, 60):
-            rad = math.radians(angle)
-            sensor_x = self.x + self.radius * 2.0 * math.cos(rad)
-            sensor_y = self.y + self.radius * 2.0 * math.sin(rad)
-            res = vein_sim.get_flow_resistance(sensor_x, sensor_y)
-            res_samples.append(res)
-        
-        avg_resistance = sum(res_samples) / len(res_samples)
+        if vein_sim.find_clog_near(self.x, 100 + self.radius * 2) is None:
+            # Open vein: no uncleared clog reaches even the outer sensor ring,
+            # so every reading is the field's baseline
+            avg_viscosity = vein_sim.FIELDS['viscosity'][0]
+            avg_reflectance = vein_sim.FIELDS['reflectance'][0]
+            avg_resistance = vein_sim.FIELDS['resistance'][0]
+        else:
+            # Viscosity sensing
+            sx = self.x + self.radius * COS_V
+            sy = self.y + self.radius * SIN_V
+            avg_viscosity = float(vein_sim.field_at(sx, sy, 'viscosity').mean())
+            
+            # Optical sensing
+            sx = self.x + self.radius * 1.5 * COS_O
+            sy = self.y + self.radius * 1.5 * SIN_O
+            avg_reflectance = float(vein_sim.field_at(sx, sy, 'reflectance').mean())
+            
+            # Resistance sensing
+            sx = self.x + self.radius * 2.0 * COS_R
+            sy = self.y + self.radius * 2.0 * SIN_R
+            avg_resistance = float(vein_sim.field_at(sx, sy, 'resistance').mean())
         
         # Store sensor data
         self.sensor_data = {
@@ -93,17 +183,13 @@ class RealisticNanobot:
             'resistance': avg_resistance,
         }
         
-        # Calculate normalized signals (0-1)
-        visc_signal = min(1.0, (avg_viscosity - 4.5) / 45.0)
-        refl_signal = min(1.0, avg_reflectance / 0.85)
-        res_signal = min(1.0, (avg_resistance - 1.0) / 95.0)
+        # Calculate normalized signals (0-1); kept for the HUD bars
+        self.visc_signal = visc_signal = min(1.0, (avg_viscosity - 4.5) / 45.0)
+        self.refl_signal = refl_signal = min(1.0, avg_reflectance / 0.85)
+        self.res_signal = res_signal = min(1.0, (avg_resistance - 1.0) / 95.0)
         
         # Multi-modal detection
-        signal_count = sum([
-            visc_signal > 0.3,
-            refl_signal > 0.3,
-            res_signal > 0.3
-        ])
+        signal_count = (visc_signal > 0.3) + (refl_signal > 0.3) + (res_signal > 0.3)
         
         if signal_count >= 2:
             self.clog_detected = True
@@ -119,52 +205,10 @@ class RealisticNanobot:
         Update nanobot movement with realistic physics.
         Uses acceleration/deceleration for natural motion.
         """
-        # Calculate desired direction
-        dx = target_x - self.x
-        
-        if self.state == "SEARCHING":
-            # Normal searching: accelerate toward target
-            if dx > 0:
-                # Accelerate if below max velocity
-                if self.velocity < self.max_velocity:
-                    self.acceleration = self.max_acceleration
-                else:
-                    self.acceleration = 0
-            else:
-                self.acceleration = 0
-        
-        elif self.state == "APPROACHING":
-            # Approaching clog: decelerate for precision
-            desired_vel = 1.0  # Slower approach
-            if self.velocity > desired_vel:
-                self.acceleration = -self.max_acceleration * 0.8  # Gentle deceleration
-            elif self.velocity < desired_vel:
-                self.acceleration = self.max_acceleration * 0.5
-            else:
-                self.acceleration = 0
-        
-        elif self.state == "CLEARING":
-            # Stop completely while clearing
-            self.acceleration = -self.velocity * 0.3  # Friction to stop
-            if abs(self.velocity) < 0.05:
-                self.velocity = 0
-                self.acceleration = 0
-        
-        elif self.state == "CONTINUING":
-            # Resume after clearing: accelerate smoothly
-            if self.velocity < self.max_velocity:
-                self.acceleration = self.max_acceleration
-            else:
-                self.acceleration = 0
-        
-        # Apply physics: v = v + a
-        self.velocity += self.acceleration
-        
-        # Clamp velocity
-        self.velocity = max(-self.max_velocity, min(self.max_velocity, self.velocity))
-        
-        # Update position: x = x + v
-        self.x += self.velocity
+        self.velocity, self.x, self.acceleration = step_physics(
+            int(self.state), self.velocity, self.x, float(target_x),
+            self.max_velocity, self.max_acceleration,
+        )
     
     def update_state(self, frame_idx):
         """
@@ -172,18 +216,18 @@ class RealisticNanobot:
         Early clearing: Start clearing as soon as clog is detected (not just when close).
         """
         if self.clog_detected and self.detection_signal > 0.4:
-            if self.state == "SEARCHING":
+            if self.state == BotState.SEARCHING:
                 # Start approaching immediately when clog detected
-                self.state = "APPROACHING"
+                self.state = BotState.APPROACHING
             
             # Start clearing as soon as signal is strong enough (earlier detection)
-            if self.detection_signal > 0.6 and self.state == "APPROACHING":
-                self.state = "CLEARING"
+            if self.detection_signal > 0.6 and self.state == BotState.APPROACHING:
+                self.state = BotState.CLEARING
                 self.is_clearing = True
                 self.clearing_time = 0
         
         # Update clearing progress
-        if self.state == "CLEARING" and self.is_clearing:
+        if self.state == BotState.CLEARING and self.is_clearing:
             self.clearing_time += 1
             self.clearing_progress = min(1.0, self.clearing_time / self.clearing_time_needed)
             
@@ -191,16 +235,23 @@ class RealisticNanobot:
             if self.clearing_progress >= 1.0:
                 self.is_clearing = False
                 self.clog_detected = False
-                self.state = "CONTINUING"
+                self.state = BotState.CONTINUING
         
         # Resume movement after clearing
-        if self.state == "CONTINUING" and self.velocity >= self.max_velocity * 0.8:
-            self.state = "SEARCHING"
+        if self.state == BotState.CONTINUING and self.velocity >= self.max_velocity * 0.8:
+            self.state = BotState.SEARCHING
 
 
 class VeinEnvironment:
     """Vein environment with clog properties."""
     
+    # Baseline value and peak increase at a full-density clog for each field
+    FIELDS = {
+        'viscosity': (4.5, 45.0),
+        'reflectance': (0.08, 0.85),
+        'resistance': (1.0, 95.0),
+    }
+    
     def __init__(self, width=900, height=650):
         self.width = width
         self.height = height
@@ -209,93 +260,213 @@ class VeinEnvironment:
         self.vein_center = (self.vein_top + self.vein_bottom) / 2
         self.vein_width = self.vein_bottom - self.vein_top
         
-        # Multiple clogs - each spans full vein width
-        self.clogs = [
-            {'center_x': 300, 'density': 1.0, 'cleared': False},
-            {'center_x': 550, 'density': 1.0, 'cleared': False},
-            {'center_x': 750, 'density': 1.0, 'cleared': False},
-        ]
+        # Multiple clogs - each spans full vein width. Stored as parallel
+        # arrays (centre x, density 0-1, cleared flag) indexed by clog, in
+        # ascending order of centre.
+        self.clog_centers = np.array([300, 550, 750], dtype=np.float32)
+        self.clog_density = np.ones(3)
+        self.clog_cleared = np.zeros(3, dtype=bool)
         self.current_clog_idx = 0
         self.vein_width_coverage = self.vein_width  # FULL WIDTH blockage
     
+    def find_clog_near(self, x, reach):
+        """
+        Index of the first un-cleared clog whose centre is within `reach` of x
+        (None if there is none). Centres are sorted, so only the clogs inside
+        the window are visited.
+        """
+        lo = np.searchsorted(self.clog_centers, x - reach, side='right')
+        hi = np.searchsorted(self.clog_centers, x + reach, side='left')
+        for idx in range(lo, hi):
+            if not self.clog_cleared[idx]:
+                return idx
+        return None
+    
     def is_in_clog_zone(self, x, y):
-        """Check if position is in a clog zone."""
-        for clog in self.clogs:
-            if clog['cleared']:
-                continue  # Skip cleared clogs
-            clog_center_x = clog['center_x']
-            in_x = abs(x - clog_center_x) < 80  # Clog zone width
-            in_y = self.vein_top <= y <= self.vein_bottom
-            if in_x and in_y:
-                return True, clog
-        return False, None
+        """Check if position is in a clog zone; returns (in_zone, clog index)."""
+        if not self.vein_top <= y <= self.vein_bottom:
+            return False, None
+        idx = self.find_clog_near(x, 80)  # Clog zone width
+        return idx is not None, idx
     
     def get_current_clog(self, x):
-        """Get the next un-cleared clog that bot will encounter."""
-        for idx, clog in enumerate(self.clogs):
-            if not clog['cleared'] and x < clog['center_x']:
-                return idx, clog
-        return None, None
+        """Get the index of the next un-cleared clog that bot will encounter (None if none left)."""
+        # Clogs are sorted by centre: start at the first one ahead of x
+        for idx in range(np.searchsorted(self.clog_centers, x, side='right'), self.clog_centers.size):
+            if not self.clog_cleared[idx]:
+                return idx
+        return None
+    
+    def field_at(self, x, y, kind):
+        """
+        Evaluate a clog field (viscosity, reflectance or resistance) at an
+        array of sensor positions. Each uncleared clog raises the field
+        linearly towards its centre (full width, so only x matters); the
+        strongest clog wins.
+        """
+        base, coef = self.FIELDS[kind]
+        xs = np.atleast_1d(np.asarray(x, dtype=float))
+        values = _field_many(xs, self.clog_centers, self.clog_density, self.clog_cleared, base, coef)
+        return values.reshape(np.shape(x))
     
     def get_viscosity_at_position(self, x, y):
         """Viscosity gradient around clogs (full width)."""
-        normal_viscosity = 4.5
-        max_viscosity_increase = 0
-        
-        # Check all clogs
-        for clog in self.clogs:
-            if clog['cleared']:
-                continue
-            clog_center_x = clog['center_x']
-            if abs(x - clog_center_x) < 100:  # In range of any clog
-                distance_from_center_x = abs(x - clog_center_x)
-                proximity_factor = max(0, 1.0 - distance_from_center_x / 80.0)
-                viscosity_increase = 45 * clog['density'] * proximity_factor
-                max_viscosity_increase = max(max_viscosity_increase, viscosity_increase)
-        
-        return normal_viscosity + max_viscosity_increase
+        return float(self.field_at(x, y, 'viscosity'))
     
     def get_optical_reflectance(self, x, y):
         """Optical reflectance around clogs (full width)."""
-        base_reflectance = 0.08
-        max_reflectance_increase = 0
-        
-        # Check all clogs
-        for clog in self.clogs:
-            if clog['cleared']:
-                continue
-            clog_center_x = clog['center_x']
-            if abs(x - clog_center_x) < 100:
-                distance_from_center_x = abs(x - clog_center_x)
-                proximity_factor = max(0, 1.0 - distance_from_center_x / 80.0)
-                reflectance_increase = 0.85 * clog['density'] * proximity_factor
-                max_reflectance_increase = max(max_reflectance_increase, reflectance_increase)
-        
-        return base_reflectance + max_reflectance_increase
+        return float(self.field_at(x, y, 'reflectance'))
     
     def get_flow_resistance(self, x, y):
         """Flow resistance around clogs (full width)."""
-        base_resistance = 1.0
-        max_resistance_increase = 0
-        
-        # Check all clogs
-        for clog in self.clogs:
-            if clog['cleared']:
-                continue
-            clog_center_x = clog['center_x']
-            if abs(x - clog_center_x) < 100:
-                distance_from_center_x = abs(x - clog_center_x)
-                proximity_factor = max(0, 1.0 - distance_from_center_x / 80.0)
-                resistance_increase = 95 * clog['density'] * proximity_factor
-                max_resistance_increase = max(max_resistance_increase, resistance_increase)
-        
-        return base_resistance + max_resistance_increase
-
-
-def create_realistic_simulation():
-    """Create simulation with realistic movement and clearing."""
-    import imageio
+        return float(self.field_at(x, y, 'resistance'))
+
+
+# Nanobot looks (glow, body fill, body outline): clearing, detecting, searching
+BOT_LOOKS = (
+    ((255, 100, 50), (255, 100, 0), (200, 50, 0)),    # Orange-red while clearing
+    ((255, 150, 100), (200, 120, 50), (150, 70, 0)),  # Orange when detecting
+    ((100, 180, 255), (50, 100, 200), (0, 50, 150)),  # Blue when searching
+)
+
+# Physics steps every frame but only every RENDER_EVERY-th frame is drawn and
+# encoded; the video frame rate is divided to match, so duration is unchanged
+RENDER_EVERY = 2
+
+# HUD layout: sensor bars (stacked 20 px apart) and the clearing progress bar
+SENSOR_BAR_TOP = 135
+SENSOR_BAR_WIDTH = 200
+CLEARING_BAR_WIDTH = 400
+
+# Sensor bar reading labels and fill colours, top to bottom
+SENSOR_BARS = (
+    ("Viscosity: ", (255, 100, 100)),
+    ("Reflectance: ", (100, 150, 255)),
+    ("Resistance: ", (100, 200, 100)),
+)
+SENSOR_LABEL_WIDTHS = tuple(FONT.getlength(label) for label, _ in SENSOR_BARS)
+
+# Clog tile palette by label: 1 fill, 2 outline, 3 platelet (scaled by density)
+CLOG_PALETTE = np.array([(0, 0, 0), (220, 80, 80), (150, 0, 0), (180, 40, 40)], dtype=float)
+PLATELET_RADIUS = 5
+
+# Horizontal spacing of the scrolling blood cells
+CELL_SPACING = 50
+
+
+def render_static_background(vein_sim):
+    """
+    Pre-render the frame-invariant layer as an array: blood plasma, vein walls
+    and the title text.
+    """
+    bg = np.empty((vein_sim.height, vein_sim.width, 3), dtype=np.uint8)
+    bg[:] = (255, 240, 240)
+    # Vein structure
+    draw_vein(bg, vein_sim.vein_top, vein_sim.vein_bottom, (100, 100, 150), 10)
+    
+    img = Image.fromarray(bg)
+    draw = ImageDraw.Draw(img)
+    draw.text((20, 15), "Realistic Nanobot Movement & Clearing", fill=(0, 0, 0), font=FONT)
+    draw.text((20, 35), "Based on Cornell Light-Powered Microbots (100-250 μm)", fill=(60, 60, 60), font=FONT)
     
+    # Sensor bar outlines and reading labels; only the fills and values change per frame
+    for i, (label, _) in enumerate(SENSOR_BARS):
+        bar_y = SENSOR_BAR_TOP + 20 * i
+        draw.rectangle([20, bar_y, 20 + SENSOR_BAR_WIDTH, bar_y + 15], outline=(100, 100, 100))
+        draw.text((230, bar_y), label, fill=(0, 0, 0), font=FONT)
+    return np.array(img)
+
+
+def render_clearing_panel(vein_sim, background):
+    """
+    Pre-render the static part of the clearing display (its captions and the
+    empty progress bar) as the background rows it occupies, from
+    CLEARING_PANEL_TOP down to the bottom of the frame.
+    """
+    img = Image.fromarray(background)
+    draw = ImageDraw.Draw(img)
+    clearing_y = vein_sim.height - 100
+    draw.text((20, clearing_y), "CLEARING IN PROGRESS", fill=(255, 0, 0), font=FONT)
+    draw.rectangle([20, clearing_y + 45, 20 + CLEARING_BAR_WIDTH, clearing_y + 60],
+                  outline=(100, 100, 100))
+    draw.text((20, clearing_y + 65), "Nanobot is STATIONARY - clearing blockage...", 
+             fill=(255, 0, 0), font=FONT)
+    return np.array(img)[clearing_y:]
+
+
+def paint_bar(canvas, y, signal, color):
+    """Fill a sensor bar in proportion to its signal; the outline is in the background."""
+    canvas[y:y + 16, 20:21 + int(signal * SENSOR_BAR_WIDTH)] = color
+
+
+def render_blood_cell_sprite():
+    """Single red blood cell, 9x9 with its centre at (4, 4)."""
+    sprite = Image.new('RGBA', (9, 9), (0, 0, 0, 0))
+    ImageDraw.Draw(sprite).ellipse([0, 0, 8, 8], fill=(200, 50, 50), outline=(150, 30, 30))
+    return sprite_arrays(sprite)
+
+
+def render_blood_cell_pixels(vein_sim):
+    """
+    Pre-render the blood cells at scroll offset 0 as a list of opaque pixels:
+    their rows, the x of the cell each belongs to, the x offset from that
+    cell's centre, and colour. Scrolling a frame is then one scatter.
+    """
+    cell_rgb, cell_mask = render_blood_cell_sprite()
+    dy, dx = np.nonzero(cell_mask)
+    rows, centers, offsets, colors = [], [], [], []
+    for i in range(20):
+        rows.append(int(vein_sim.vein_center + (i % 3 - 1) * 30) - 4 + dy)
+        centers.append(np.full(dy.size, (i * CELL_SPACING) % vein_sim.width))
+        offsets.append(dx - 4)
+        colors.append(cell_rgb[dy, dx])
+    return (np.concatenate(rows), np.concatenate(centers),
+            np.concatenate(offsets), np.concatenate(colors))
+
+
+def render_sensor_dot_sprite():
+    """Yellow sensor point, 5x5 with its centre at (2, 2)."""
+    sprite = Image.new('RGBA', (5, 5), (0, 0, 0, 0))
+    ImageDraw.Draw(sprite).ellipse([0, 0, 4, 4], fill=(255, 200, 0))
+    return sprite_arrays(sprite)
+
+
+@lru_cache(maxsize=None)
+def render_clog_labels(clog_height, platelets):
+    """
+    Label map of one full-width clog (see CLOG_PALETTE), optionally with its
+    platelets. The tile's (0, 0) sits PLATELET_RADIUS pixels left of and above
+    the clog rectangle, since edge platelets overhang it.
+    """
+    pad = PLATELET_RADIUS
+    labels = Image.new('L', (160 + 1 + pad, clog_height + 1 + pad), 0)
+    draw = ImageDraw.Draw(labels)
+    draw.rectangle([pad, pad, pad + 160, pad + clog_height], fill=1, outline=2, width=3)
+    if platelets:
+        # Platelets distributed across full blockage
+        for y_offset in range(0, clog_height, 30):
+            for x_offset in range(0, 160, 30):
+                draw.ellipse([x_offset, y_offset, x_offset + 2 * pad, y_offset + 2 * pad], fill=3)
+    return np.asarray(labels)
+
+
+@lru_cache(maxsize=16)
+def clog_stamp(clog_height, density):
+    """
+    Density-scaled RGB stamp of one clog and its opacity mask (darker = denser).
+    Platelets only show while the clog is dense. Intact clogs reuse the same
+    cached stamp every frame.
+    """
+    labels = render_clog_labels(clog_height, density > 0.1)
+    rgb = np.take((CLOG_PALETTE * density).astype(np.uint8), labels, axis=0)
+    return rgb, labels > 0
+
+
+def create_realistic_simulation(render_every=RENDER_EVERY):
+    """
+    Create simulation with realistic movement and clearing.
+    Physics runs every frame; only every `render_every`-th frame is rendered.
+    """
     OUTPUT_DIR = "c:\\Sansten\\vRobot\\outputs"
     VIDEO_PATH = os.path.join(OUTPUT_DIR, "nanobot_sim_realistic.mp4")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -305,17 +476,26 @@ def create_realistic_simulation():
     vein_sim = VeinEnvironment(width=900, height=650)
     nanobot = RealisticNanobot()
     
-    frames = []
+    background = render_static_background(vein_sim)
+    clearing_panel = render_clearing_panel(vein_sim, background)
+    cell_rows, cell_centers, cell_offsets, cell_colors = render_blood_cell_pixels(vein_sim)
+    dot_rgb, dot_mask = render_sensor_dot_sprite()
+    
     num_frames = 900  # Extended to handle 3 clogs (was 600)
     
+    # Frames are streamed to the encoder as they are drawn instead of being held in memory
+    print(f"Writing video to {VIDEO_PATH}...", flush=True)
+    writer = imageio.get_writer(VIDEO_PATH, fps=30 / render_every, codec='libx264', quality=7,
+                                macro_block_size=1, ffmpeg_params=['-preset', 'ultrafast'])
+    
     for frame_idx in range(num_frames):
         # Update nanobot sensors
         nanobot.update_sensors(vein_sim, frame_idx)
         
         # Find next unclearedclog as target
-        clog_idx, next_clog = vein_sim.get_current_clog(nanobot.x)
-        if next_clog:
-            target_x = next_clog['center_x'] + 100
+        clog_idx = vein_sim.get_current_clog(nanobot.x)
+        if clog_idx is not None:
+            target_x = vein_sim.clog_centers[clog_idx] + 100
         else:
             # All clogs cleared, continue forward
             target_x = 850
@@ -329,110 +509,78 @@ def create_realistic_simulation():
         # Update clog density if clearing (full removal required)
         if nanobot.is_clearing:
             # Find the current clog being cleared
-            clog_idx, current_clog = vein_sim.get_current_clog(nanobot.x)
-            if current_clog is None:
+            clog_idx = vein_sim.get_current_clog(nanobot.x)
+            if clog_idx is None:
                 # Try to find any clog in range
-                for clog in vein_sim.clogs:
-                    if not clog['cleared'] and abs(nanobot.x - clog['center_x']) < 150:
-                        current_clog = clog
-                        break
+                clog_idx = vein_sim.find_clog_near(nanobot.x, 150)
             
-            if current_clog:
+            if clog_idx is not None:
                 # Decrease density (0.0 = fully cleared)
-                current_clog['density'] = max(0.0, 1.0 - nanobot.clearing_progress)
+                vein_sim.clog_density[clog_idx] = max(0.0, 1.0 - nanobot.clearing_progress)
                 # Mark as cleared when done
                 if nanobot.clearing_progress >= 1.0:
-                    current_clog['density'] = 0.0
-                    current_clog['cleared'] = True
+                    vein_sim.clog_density[clog_idx] = 0.0
+                    vein_sim.clog_cleared[clog_idx] = True
+        
+        if frame_idx % render_every:
+            continue
         
         # === Draw frame ===
-        img = Image.new('RGB', (vein_sim.width, vein_sim.height), color=(255, 240, 240))
-        draw = ImageDraw.Draw(img)
+        # Start from the pre-rendered background and vein structure
+        canvas = background.copy()
         
-        # Vein structure
-        draw.rectangle([0, vein_sim.vein_top - 10, vein_sim.width, vein_sim.vein_top], 
-                      fill=(100, 100, 150))
-        draw.rectangle([0, vein_sim.vein_bottom, vein_sim.width, vein_sim.vein_bottom + 10], 
-                      fill=(100, 100, 150))
-        
-        # Blood cells background
-        import random
-        random.seed(frame_idx // 5)
-        for i in range(20):
-            cell_x = (frame_idx + i * 50) % vein_sim.width
-            cell_y = vein_sim.vein_center + (i % 3 - 1) * 30
-            if vein_sim.vein_top < cell_y < vein_sim.vein_bottom:
-                draw.ellipse([cell_x - 4, cell_y - 4, cell_x + 4, cell_y + 4],
-                            fill=(200, 50, 50), outline=(150, 30, 30))
+        # Blood cells background: every cell scrolls right by one pixel per
+        # frame, wrapping at the right edge; pixels off the frame are dropped
+        cell_x = (cell_centers + frame_idx) % vein_sim.width + cell_offsets
+        visible = (cell_x >= 0) & (cell_x < vein_sim.width)
+        canvas[cell_rows[visible], cell_x[visible]] = cell_colors[visible]
         
         # === Draw all clogs (full-width blockages) ===
-        for clog in vein_sim.clogs:
-            if clog['density'] > 0.01:  # Only draw if clog still exists
-                clog_center_x = clog['center_x']
-                # Clog spans full vein width
-                clog_left = clog_center_x - 80
-                clog_right = clog_center_x + 80
-                clog_top = int(vein_sim.vein_top)
-                clog_bottom = int(vein_sim.vein_bottom)
-                
-                # Draw clog with density-based opacity (darker = denser)
-                clog_color = (int(220 * clog['density']), 
-                             int(80 * clog['density']), 
-                             int(80 * clog['density']))
-                outline_color = (int(150 * clog['density']), 0, 0)
-                
-                draw.rectangle([clog_left, clog_top, clog_right, clog_bottom], 
-                              fill=clog_color, outline=outline_color, width=3)
-                
-                # Platelets distributed across full blockage
-                for y_offset in range(int(vein_sim.vein_top), int(vein_sim.vein_bottom), 30):
-                    for x_offset in range(clog_left, clog_right, 30):
-                        if clog['density'] > 0.1:  # Only show platelets if clog exists
-                            platelet_color = (int(180 * clog['density']), 
-                                            int(40 * clog['density']), 
-                                            int(40 * clog['density']))
-                            draw.ellipse([x_offset - 5, y_offset - 5, x_offset + 5, y_offset + 5],
-                                        fill=platelet_color)
+        for clog_center_x, density in zip(vein_sim.clog_centers.tolist(), vein_sim.clog_density.tolist()):
+            if density > 0.01:  # Only draw if clog still exists
+                rgb, mask = clog_stamp(vein_sim.vein_bottom - vein_sim.vein_top, density)
+                # The clog rectangle is opaque; only the platelet overhang above
+                # and to its left needs masking
+                pad = PLATELET_RADIUS
+                left = int(clog_center_x) - 80
+                top = vein_sim.vein_top
+                canvas[top:top + rgb.shape[0] - pad, left:left + rgb.shape[1] - pad] = rgb[pad:, pad:]
+                blit(canvas, rgb[:pad], mask[:pad], left - pad, top - pad)
+                blit(canvas, rgb[pad:, :pad], mask[pad:, :pad], left - pad, top)
         
         # === Draw nanobot with state indication ===
-        # Glow based on state and detection
-        if nanobot.state == "CLEARING":
-            glow_color = (255, 100, 50)  # Orange-red during clearing
-            glow_intensity = 200
-        elif nanobot.clog_detected:
-            glow_color = (255, 150, 100)  # Orange when detecting
-            glow_intensity = int(nanobot.detection_signal * 200)
-        else:
-            glow_color = (100, 180, 255)  # Blue when searching
-            glow_intensity = 100
-        
-        glow_radius = nanobot.radius + 12
-        glow_bbox = [nanobot.x - glow_radius, nanobot.y - glow_radius,
-                    nanobot.x + glow_radius, nanobot.y + glow_radius]
-        draw.ellipse(glow_bbox, fill=glow_color, outline=(100, 150, 255), width=1)
-        
-        # Main body color based on state
-        if nanobot.state == "CLEARING":
-            bot_color = (255, 100, 0)  # Bright orange
-            bot_outline = (200, 50, 0)
+        # Glow and body colour based on state and detection
+        if nanobot.state == BotState.CLEARING:
+            look = 0
         elif nanobot.clog_detected:
-            bot_color = (200, 120, 50)  # Orange
-            bot_outline = (150, 70, 0)
+            look = 1
         else:
-            bot_color = (50, 100, 200)  # Blue
-            bot_outline = (0, 50, 150)
-        
-        bot_bbox = [nanobot.x - nanobot.radius, nanobot.y - nanobot.radius,
-                   nanobot.x + nanobot.radius, nanobot.y + nanobot.radius]
-        draw.ellipse(bot_bbox, fill=bot_color, outline=bot_outline, width=2)
+            look = 2
+        glow_color, bot_color, bot_outline = BOT_LOOKS[look]
+        draw_bot(canvas, nanobot.x, nanobot.y, nanobot.radius, bot_color, bot_outline,
+                 glow_color, nanobot.radius + 12)
         
         # Sensor points
-        for angle in range(0, 360, 45):
-            rad = math.radians(angle)
-            sensor_x = nanobot.x + (nanobot.radius + 6) * math.cos(rad)
-            sensor_y = nanobot.y + (nanobot.radius + 6) * math.sin(rad)
-            draw.ellipse([sensor_x - 2, sensor_y - 2, sensor_x + 2, sensor_y + 2],
-                        fill=(255, 200, 0))
+        for cos_a, sin_a in _SENSOR_DOT_DIRS:
+            sensor_x = nanobot.x + (nanobot.radius + 6) * cos_a
+            sensor_y = nanobot.y + (nanobot.radius + 6) * sin_a
+            blit(canvas, dot_rgb, dot_mask, math.floor(sensor_x) - 2, math.floor(sensor_y) - 2)
+        
+        # Sensor bar fills
+        signals = (nanobot.visc_signal, nanobot.refl_signal, nanobot.res_signal)
+        for i, (signal, (_, bar_color)) in enumerate(zip(signals, SENSOR_BARS)):
+            paint_bar(canvas, SENSOR_BAR_TOP + 20 * i, signal, bar_color)
+        
+        # Clearing display: static panel plus the progress fill
+        if nanobot.is_clearing:
+            clearing_y = vein_sim.height - 100
+            canvas[clearing_y:] = clearing_panel
+            fill_rect(canvas, 20, clearing_y + 45,
+                      20 + int(nanobot.clearing_progress * CLEARING_BAR_WIDTH), clearing_y + 60, (255, 100, 0))
+        
+        # Overlays (velocity arrow and text) are drawn with PIL
+        img = Image.fromarray(canvas)
+        draw = ImageDraw.Draw(img)
         
         # Movement vectors (showing velocity)
         if nanobot.velocity > 0.1:
@@ -447,54 +595,25 @@ def create_realistic_simulation():
                         fill=(100, 200, 100))
         
         # === Display information ===
-        draw.text((20, 15), "Realistic Nanobot Movement & Clearing", fill=(0, 0, 0))
-        draw.text((20, 35), "Based on Cornell Light-Powered Microbots (100-250 μm)", fill=(60, 60, 60))
-        
         # Clog status display
-        cleared_count = sum(1 for clog in vein_sim.clogs if clog['cleared'])
-        draw.text((20, 50), f"Clogs: {cleared_count}/{len(vein_sim.clogs)} cleared", fill=(100, 100, 100))
+        cleared_count = int(vein_sim.clog_cleared.sum())
+        draw.text((20, 50), f"Clogs: {cleared_count}/{vein_sim.clog_cleared.size} cleared", fill=(100, 100, 100), font=FONT)
         
         # State display
-        state_colors = {
-            "SEARCHING": (0, 150, 0),
-            "APPROACHING": (200, 150, 0),
-            "CLEARING": (255, 0, 0),
-            "CONTINUING": (0, 100, 200)
-        }
-        state_color = state_colors.get(nanobot.state, (0, 0, 0))
-        draw.text((20, 70), f"State: {nanobot.state}", fill=state_color)
+        state_color = STATE_COLORS[nanobot.state]
+        draw.text((20, 70), f"State: {nanobot.state.name}", fill=state_color, font=FONT)
         
         # Velocity display
-        draw.text((20, 90), f"Velocity: {nanobot.velocity:.2f} px/frame", fill=(0, 0, 0))
-        draw.text((20, 110), f"Acceleration: {nanobot.acceleration:.3f} px/frame²", fill=(0, 0, 0))
-        
-        # Sensor readings
-        visc_signal = min(1.0, (nanobot.sensor_data['viscosity'] - 4.5) / 45.0)
-        refl_signal = min(1.0, nanobot.sensor_data['reflectance'] / 0.85)
-        res_signal = min(1.0, (nanobot.sensor_data['resistance'] - 1.0) / 95.0)
-        
-        bar_y = 135
-        bar_width = 200
-        
-        # Viscosity
-        draw.rectangle([20, bar_y, 20 + bar_width, bar_y + 15], outline=(100, 100, 100))
-        draw.rectangle([20, bar_y, 20 + int(visc_signal * bar_width), bar_y + 15], 
-                      fill=(255, 100, 100))
-        draw.text((230, bar_y), f"Viscosity: {nanobot.sensor_data['viscosity']:.1f} cP", fill=(0, 0, 0))
-        
-        # Reflectance
-        bar_y += 20
-        draw.rectangle([20, bar_y, 20 + bar_width, bar_y + 15], outline=(100, 100, 100))
-        draw.rectangle([20, bar_y, 20 + int(refl_signal * bar_width), bar_y + 15], 
-                      fill=(100, 150, 255))
-        draw.text((230, bar_y), f"Reflectance: {nanobot.sensor_data['reflectance']:.3f}", fill=(0, 0, 0))
-        
-        # Resistance
-        bar_y += 20
-        draw.rectangle([20, bar_y, 20 + bar_width, bar_y + 15], outline=(100, 100, 100))
-        draw.rectangle([20, bar_y, 20 + int(res_signal * bar_width), bar_y + 15], 
-                      fill=(100, 200, 100))
-        draw.text((230, bar_y), f"Resistance: {nanobot.sensor_data['resistance']:.1f}", fill=(0, 0, 0))
+        draw.text((20, 90), f"Velocity: {nanobot.velocity:.2f} px/frame", fill=(0, 0, 0), font=FONT)
+        draw.text((20, 110), f"Acceleration: {nanobot.acceleration:.3f} px/frame²", fill=(0, 0, 0), font=FONT)
+        
+        # Sensor reading values, placed after their pre-rendered labels
+        readings = (f"{nanobot.sensor_data['viscosity']:.1f} cP",
+                    f"{nanobot.sensor_data['reflectance']:.3f}",
+                    f"{nanobot.sensor_data['resistance']:.1f}")
+        for i, value in enumerate(readings):
+            draw.text((230 + SENSOR_LABEL_WIDTHS[i], SENSOR_BAR_TOP + 20 * i), value, fill=(0, 0, 0), font=FONT)
+        bar_y = SENSOR_BAR_TOP + 40
         
         # Clog detection
         if nanobot.clog_detected:
@@ -504,30 +623,19 @@ def create_realistic_simulation():
             status = "🟢 Searching for blockage"
             status_color = (0, 150, 0)
         
-        draw.text((20, bar_y + 30), status, fill=status_color)
+        draw.text((20, bar_y + 30), status, fill=status_color, font=FONT)
         
         # === Clearing phase display ===
         if nanobot.is_clearing:
+            # Captions and the empty progress bar come from the pre-rendered panel
             clearing_y = vein_sim.height - 100
-            draw.text((20, clearing_y), "CLEARING IN PROGRESS", fill=(255, 0, 0))
             draw.text((20, clearing_y + 20), f"Clearing Progress: {nanobot.clearing_progress*100:.0f}%", 
-                     fill=(255, 100, 0))
-            
-            # Progress bar
-            progress_bar_width = 400
-            draw.rectangle([20, clearing_y + 45, 20 + progress_bar_width, clearing_y + 60],
-                          outline=(100, 100, 100))
-            draw.rectangle([20, clearing_y + 45, 20 + int(nanobot.clearing_progress * progress_bar_width), 
-                           clearing_y + 60], fill=(255, 100, 0))
-            
-            draw.text((20, clearing_y + 65), "Nanobot is STATIONARY - clearing blockage...", 
-                     fill=(255, 0, 0))
+                     fill=(255, 100, 0), font=FONT)
         
-        frames.append(img)
+        writer.append_data(np.asarray(img))
     
-    print(f"Generated {len(frames)} frames with realistic movement", flush=True)
-    print(f"Saving video to {VIDEO_PATH}...", flush=True)
-    imageio.mimsave(VIDEO_PATH, frames, fps=30)
+    writer.close()
+    print(f"Generated {len(range(0, num_frames, render_every))} frames with realistic movement", flush=True)
     print(f"✓ Realistic simulation saved: {VIDEO_PATH}", flush=True)
     return VIDEO_PATH
 
@@ -4,12 +4,48 @@ Nanobot Simulation: Visualizing a nanobot clearing a varicose vein clog.
 Creates an MP4 video showing the simulation.
 """
 import os
+from functools import lru_cache
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
+from draw_utils import blit, sprite_arrays, draw_vein, draw_bot
 
-def create_nanobot_simulation():
+# Only every RENDER_EVERY-th frame is drawn and encoded; the video frame rate is
+# divided to match, so the animation keeps its duration
+RENDER_EVERY = 2
+
+# Loaded once and shared by every text draw
+FONT = ImageFont.load_default()
+
+def render_background(width, height):
+    """Pre-render the static layer: background, vein walls, interior grid and title."""
+    bg = np.empty((height, width, 3), dtype=np.uint8)
+    bg[:] = (245, 245, 250)  # Light blue background
+    
+    # Vein walls (top and bottom)
+    draw_vein(bg, 170, 430, (180, 180, 200), 20)
+    
+    # Add grid to show vein interior
+    bg[170:431, 0:width:80] = (220, 220, 230)
+    
+    img = Image.fromarray(bg)
+    draw = ImageDraw.Draw(img)
+    title_text = "Nanobot Vein Clog Clearance Simulation"
+    draw.text((width//2 - 150, 20), title_text, fill=(0, 0, 0), font=FONT)
+    return np.array(img)
+
+@lru_cache(maxsize=None)
+def clog_sprite(radius):
+    """Clog disc of the given radius with its dark outline, centred at (radius, radius)."""
+    sprite = Image.new('RGBA', (2 * radius + 1, 2 * radius + 1), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite)
+    draw.ellipse([0, 0, 2 * radius, 2 * radius], fill=(220, 50, 50))  # Bright red clog
+    draw.ellipse([0, 0, 2 * radius, 2 * radius], outline=(150, 0, 0), width=2)  # Dark red outline
+    return sprite_arrays(sprite)
+
+def create_nanobot_simulation(render_every=RENDER_EVERY):
     """
     Create a simulation showing a blue nanobot moving through a vein
-    and clearing a red clog blockage.
+    and clearing a red clog blockage. Every `render_every`-th frame is rendered.
     """
     import imageio
     
@@ -19,23 +55,18 @@ def create_nanobot_simulation():
     
     print("Creating nanobot vein-clearing simulation...", flush=True)
     
-    frames = []
     width, height = 800, 600
     num_frames = 200
+    background = render_background(width, height)
     
-    for frame_idx in range(num_frames):
-        # Create background
-        img = Image.new('RGB', (width, height), color=(245, 245, 250))  # Light blue background
-        draw = ImageDraw.Draw(img)
-        
-        # Draw vein walls (top and bottom)
-        wall_color = (180, 180, 200)
-        draw.rectangle([0, 150, width, 170], fill=wall_color)  # Top wall
-        draw.rectangle([0, 430, width, 450], fill=wall_color)  # Bottom wall
-        
-        # Add grid to show vein interior
-        for x in range(0, width, 80):
-            draw.line([x, 170, x, 430], fill=(220, 220, 230), width=1)
+    # Frames are streamed to the encoder as they are drawn instead of being held in memory
+    print(f"Writing video to {VIDEO_PATH}...", flush=True)
+    writer = imageio.get_writer(VIDEO_PATH, fps=30 / render_every, codec='libx264', quality=7,
+                                macro_block_size=1, ffmpeg_params=['-preset', 'ultrafast'])
+    
+    for frame_idx in range(0, num_frames, render_every):
+        # Start from the pre-rendered background
+        canvas = background.copy()
         
         # Calculate progress (0 to 1)
         progress = frame_idx / num_frames
@@ -51,36 +82,25 @@ def create_nanobot_simulation():
             clog_radius = int(clog_start_radius * max(0, shrink_factor))
             
             if clog_radius > 2:
-                # Draw clog with shading
-                bbox = [clog_center_x - clog_radius, clog_center_y - clog_radius,
-                        clog_center_x + clog_radius, clog_center_y + clog_radius]
-                draw.ellipse(bbox, fill=(220, 50, 50))  # Bright red clog
-                draw.ellipse(bbox, outline=(150, 0, 0), width=2)  # Dark red outline
+                rgb, mask = clog_sprite(clog_radius)
+                blit(canvas, rgb, mask, clog_center_x - clog_radius, clog_center_y - clog_radius)
         
         # Draw nanobot (blue sphere) moving left to right
         bot_speed = 3.5
         bot_x = int(50 + frame_idx * bot_speed)
         bot_radius = 18
         
-        # Nanobot glow effect (light blue circle around it)
-        glow_radius = bot_radius + 8
-        glow_bbox = [bot_x - glow_radius, 300 - glow_radius,
-                     bot_x + glow_radius, 300 + glow_radius]
-        draw.ellipse(glow_bbox, fill=(180, 200, 255), outline=(100, 150, 255))
+        # Deep blue body with a dark outline inside a light blue glow
+        draw_bot(canvas, bot_x, 300, bot_radius, (50, 100, 200), (0, 50, 150),
+                 (180, 200, 255), bot_radius + 8)
         
-        # Main nanobot body
-        bot_bbox = [bot_x - bot_radius, 300 - bot_radius,
-                    bot_x + bot_radius, 300 + bot_radius]
-        draw.ellipse(bot_bbox, fill=(50, 100, 200))  # Deep blue
-        draw.ellipse(bot_bbox, outline=(0, 50, 150), width=2)  # Dark blue outline
+        # Overlays (indicator, text and speed arrow) are drawn with PIL
+        img = Image.fromarray(canvas)
+        draw = ImageDraw.Draw(img)
         
         # Add directional indicator on nanobot
         draw.ellipse([bot_x + 5, 295, bot_x + 12, 305], fill=(100, 200, 255))
         
-        # Add labels and status information
-        title_text = "Nanobot Vein Clog Clearance Simulation"
-        draw.text((width//2 - 150, 20), title_text, fill=(0, 0, 0))
-        
         # Status text
         if progress < 0.7:
             status = f"Nanobot approaching clog... {int(progress * 100)}%"
@@ -92,11 +112,11 @@ def create_nanobot_simulation():
             status = "Clog cleared! Blood flow restored."
             status_color = (0, 150, 0)
         
-        draw.text((50, 500), status, fill=status_color)
+        draw.text((50, 500), status, fill=status_color, font=FONT)
         
         # Draw distance indicator
         distance_text = f"Position: {int(bot_x)}px"
-        draw.text((width - 250, 500), distance_text, fill=(100, 100, 100))
+        draw.text((width - 250, 500), distance_text, fill=(100, 100, 100), font=FONT)
         
         # Velocity indicator (arrow showing speed)
         arrow_y = 550
@@ -104,13 +124,12 @@ def create_nanobot_simulation():
         draw.line([(100, arrow_y), (100 + arrow_speed, arrow_y)], fill=(100, 100, 200), width=3)
         draw.polygon([(100 + arrow_speed, arrow_y - 5), (100 + arrow_speed, arrow_y + 5),
                       (100 + arrow_speed + 8, arrow_y)], fill=(100, 100, 200))
-        draw.text((50, arrow_y + 10), "Speed →", fill=(100, 100, 100))
+        draw.text((50, arrow_y + 10), "Speed →", fill=(100, 100, 100), font=FONT)
         
-        frames.append(img)
+        writer.append_data(np.asarray(img))
     
-    print(f"Generated {len(frames)} frames", flush=True)
-    print(f"Saving video to {VIDEO_PATH}...", flush=True)
-    imageio.mimsave(VIDEO_PATH, frames, fps=30)
+    writer.close()
+    print(f"Generated {len(range(0, num_frames, render_every))} frames", flush=True)
     print(f"✓ Video saved successfully: {VIDEO_PATH}", flush=True)
     return VIDEO_PATH
 
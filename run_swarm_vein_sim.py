@@ -7,7 +7,12 @@ import os
 import math
 import random
 import argparse
-from PIL import Image, ImageDraw
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from draw_utils import sprite_arrays, sprite_table, stamp_sprites, draw_text
+from simulation_core import SCOUT, WORKER, SUPPORT, MONITOR, step_swarm
 
 SENSOR_FIELDS = ("viscosity", "impedance", "reflectance", "strain")
 SENSOR_NORM_KEYS = {
@@ -42,6 +47,9 @@ ROLE_SIZES = {
     "Support": 4,
     "Monitor": 3,
 }
+# Loaded once and shared by every text draw
+FONT = ImageFont.load_default()
+
 SENSOR_COLORS = {
     "viscosity": (220, 80, 80),
     "impedance": (80, 140, 220),
@@ -63,6 +71,15 @@ def lerp_color(color_a, color_b, t):
 
 
 class VeinSegment:
+    __slots__ = (
+        "seg_id", "start", "end", "children", "parent_id", "name", "length", "ux", "uy", "px", "py",
+        "blockage", "inflammation", "pooling", "beacon", "mapping", "pressure_spike", "scaffold",
+        "affected", "initial_state", "_field_inputs",
+        # Sensor fields, derived from the state by compute_fields
+        "viscosity", "impedance", "reflectance", "strain",
+        "visc_norm", "imp_norm", "refl_norm", "strain_norm", "abnormal",
+    )
+
     def __init__(self, seg_id, start, end, children, name, parent_id=None):
         self.seg_id = seg_id
         self.start = start
@@ -71,6 +88,10 @@ class VeinSegment:
         self.parent_id = parent_id
         self.name = name
         self.length = math.hypot(end[0] - start[0], end[1] - start[1])
+        # Unit direction and its left-hand perpendicular, fixed by the geometry
+        self.ux = (end[0] - start[0]) / (self.length or 1.0)
+        self.uy = (end[1] - start[1]) / (self.length or 1.0)
+        self.px, self.py = -self.uy, self.ux
 
         self.blockage = 0.0
         self.inflammation = 0.0
@@ -80,13 +101,23 @@ class VeinSegment:
         self.pressure_spike = 0.0
         self.scaffold = 0.0
         self.affected = False
-        self.fields = {}
         self.initial_state = {}
+        # State the current fields were computed from (None: not yet computed)
+        self._field_inputs = None
+
+        self.viscosity = self.impedance = self.reflectance = self.strain = 0.0
+        self.visc_norm = self.imp_norm = self.refl_norm = self.strain_norm = 0.0
+        self.abnormal = 0.0
 
     def midpoint(self):
         return ((self.start[0] + self.end[0]) / 2.0, (self.start[1] + self.end[1]) / 2.0)
 
     def compute_fields(self):
+        inputs = (self.blockage, self.inflammation, self.pooling, self.pressure_spike, self.scaffold)
+        if inputs == self._field_inputs:
+            return
+        self._field_inputs = inputs
+
         viscosity = 4.5 + 32.0 * self.blockage + 6.5 * self.inflammation + 10.0 * self.pooling
         impedance = 1.0 + 70.0 * self.blockage + 12.0 * self.inflammation + 14.0 * self.pooling
         reflectance = 0.10 + 0.60 * self.blockage + 0.22 * self.inflammation + 0.10 * self.pooling
@@ -99,26 +130,24 @@ class VeinSegment:
         refl_norm = clamp((reflectance - 0.10) / 0.75, 0.0, 1.0)
         strain_norm = clamp(strain / 1.2, 0.0, 1.0)
 
-        self.fields = {
-            "viscosity": viscosity,
-            "impedance": impedance,
-            "reflectance": reflectance,
-            "strain": strain,
-            "visc_norm": visc_norm,
-            "imp_norm": imp_norm,
-            "refl_norm": refl_norm,
-            "strain_norm": strain_norm,
-            "abnormal": (visc_norm + imp_norm + refl_norm + strain_norm) / 4.0,
-        }
-        return self.fields
+        self.viscosity = viscosity
+        self.impedance = impedance
+        self.reflectance = reflectance
+        self.strain = strain
+        self.visc_norm = visc_norm
+        self.imp_norm = imp_norm
+        self.refl_norm = refl_norm
+        self.strain_norm = strain_norm
+        self.abnormal = (visc_norm + imp_norm + refl_norm + strain_norm) / 4.0
 
 
-class SwarmAgent:
-    def __init__(self, role, segment_id, t, direction=1):
-        self.role = role
-        self.segment_id = segment_id
-        self.t = t
-        self.direction = direction
+@dataclass
+class AgentArrays:
+    """Swarm state as parallel arrays indexed by agent."""
+    role: np.ndarray        # int8 index into ROLE_ORDER
+    segment_id: np.ndarray  # int32
+    t: np.ndarray           # float64 position along the segment, 0-1
+    direction: np.ndarray   # int8, only Monitors walk upstream (-1)
 
 
 def build_vein_network():
@@ -138,6 +167,19 @@ def build_vein_network():
     return segments
 
 
+def segment_geometry(segments):
+    """Per-segment start point, length and unit vectors as arrays indexed by segment id."""
+    return {
+        "start_x": np.array([seg.start[0] for seg in segments], dtype=float),
+        "start_y": np.array([seg.start[1] for seg in segments], dtype=float),
+        "length": np.array([seg.length for seg in segments]),
+        "ux": np.array([seg.ux for seg in segments]),
+        "uy": np.array([seg.uy for seg in segments]),
+        "px": np.array([seg.px for seg in segments]),
+        "py": np.array([seg.py for seg in segments]),
+    }
+
+
 def initialize_pathology(segments):
     baseline = {
         0: (0.05, 0.10, 0.18),
@@ -173,42 +215,38 @@ def reset_segments(segments):
 
 
 def create_agents(swarm_size, rng):
-    counts = {
-        "Scout": int(swarm_size * 0.25),
-        "Worker": int(swarm_size * 0.45),
-        "Support": int(swarm_size * 0.15),
-    }
-    counts["Monitor"] = swarm_size - sum(counts.values())
+    num_scout = int(swarm_size * 0.25)
+    num_worker = int(swarm_size * 0.45)
+    num_support = int(swarm_size * 0.15)
+    num_monitor = swarm_size - num_scout - num_worker - num_support
 
-    roles = []
-    for role, count in counts.items():
-        roles.extend([role] * count)
+    roles = [SCOUT] * num_scout + [WORKER] * num_worker + [SUPPORT] * num_support + [MONITOR] * num_monitor
     rng.shuffle(roles)
 
-    agents = []
-    for role in roles:
-        direction = -1 if role == "Monitor" and rng.random() < 0.5 else 1
-        agents.append(SwarmAgent(role, 0, rng.random(), direction))
-    return agents
+    # Direction is drawn before t for each agent, as (direction, t) pairs
+    draws = [(-1 if role == MONITOR and rng.random() < 0.5 else 1, rng.random()) for role in roles]
+    return AgentArrays(
+        role=np.array(roles, dtype=np.int8),
+        segment_id=np.zeros(len(roles), dtype=np.int32),
+        t=np.array([t for _, t in draws]),
+        direction=np.array([direction for direction, _ in draws], dtype=np.int8),
+    )
 
 
 def role_counts(agents):
-    counts = {role: 0 for role in ROLE_ORDER}
-    for agent in agents:
-        counts[agent.role] += 1
-    return counts
+    counts = np.bincount(agents.role, minlength=len(ROLE_ORDER))
+    return dict(zip(ROLE_ORDER, counts.tolist()))
 
 
 def weighted_choice(items, weights, rng):
-    total = sum(weights)
-    if total <= 0:
-        return rng.choice(items)
-    pick = rng.random() * total
-    for item, weight in zip(items, weights):
-        pick -= weight
-        if pick <= 0:
-            return item
-    return items[-1]
+    if len(items) == 2:
+        # Common case: a two-way branch
+        total = weights[0] + weights[1]
+        if total > 0:
+            return items[0] if rng.random() * total <= weights[0] else items[1]
+    elif sum(weights) > 0:
+        return rng.choices(items, weights=weights, k=1)[0]
+    return rng.choice(items)
 
 
 def score_segment_for_role(segment, role):
@@ -217,7 +255,7 @@ def score_segment_for_role(segment, role):
     if role == "Worker":
         return segment.beacon * 1.3 + segment.blockage * 0.8 + segment.inflammation * 0.3
     if role == "Support":
-        return segment.fields.get("strain_norm", 0.0) * 1.6 + segment.pressure_spike * 1.3
+        return segment.strain_norm * 1.6 + segment.pressure_spike * 1.3
     if role == "Monitor":
         return (1.0 - segment.mapping) * 1.2 + segment.pooling * 0.2
     return 0.1
@@ -239,86 +277,231 @@ def update_role_switching(agents, segments, rng, role_switch, fps, frame_idx):
         return
 
     avg_beacon = sum(seg.beacon for seg in segments) / len(segments)
-    avg_strain = sum(seg.fields.get("strain_norm", 0.0) for seg in segments) / len(segments)
+    avg_strain = sum(seg.strain_norm for seg in segments) / len(segments)
     avg_mapping = sum(seg.mapping for seg in segments) / len(segments)
 
     if avg_beacon > 0.25:
-        scouts = [agent for agent in agents if agent.role == "Scout"]
+        scouts = np.flatnonzero(agents.role == SCOUT).tolist()
         rng.shuffle(scouts)
-        for agent in scouts[:2]:
-            agent.role = "Worker"
+        agents.role[scouts[:2]] = WORKER
 
     if avg_strain > 0.35:
-        workers = [agent for agent in agents if agent.role == "Worker"]
+        workers = np.flatnonzero(agents.role == WORKER).tolist()
         rng.shuffle(workers)
-        for agent in workers[:1]:
-            agent.role = "Support"
+        agents.role[workers[:1]] = SUPPORT
 
     if avg_mapping > 0.7:
-        monitors = [agent for agent in agents if agent.role == "Monitor"]
+        monitors = np.flatnonzero(agents.role == MONITOR).tolist()
         rng.shuffle(monitors)
-        for agent in monitors[:1]:
-            agent.role = "Scout"
+        agents.role[monitors[:1]] = SCOUT
+
+
+def step_agents(agents, segments, flow, noise_draws, beacon_strength, is_activity, rng):
+    """
+    Advance the swarm one frame: the role effects and movement run in the
+    compiled step_swarm kernel on the segment state gathered into arrays, then
+    the few agents that ran off either end pick their next segment in Python.
+    `noise_draws` holds each agent's flow noise for this frame.
+    Returns the active Worker count per segment.
+    """
+    role = agents.role
+    seg_id = agents.segment_id
+    beacon = np.array([seg.beacon for seg in segments])
+    mapping = np.array([seg.mapping for seg in segments])
+    scaffold = np.array([seg.scaffold for seg in segments])
+
+    worker_activity = step_swarm(
+        role,
+        seg_id,
+        agents.t,
+        agents.direction,
+        np.array([seg.abnormal for seg in segments]),
+        np.array([seg.strain_norm for seg in segments]),
+        np.array([seg.blockage for seg in segments]),
+        np.array([seg.pressure_spike for seg in segments]),
+        beacon,
+        mapping,
+        scaffold,
+        np.array([seg.length for seg in segments]),
+        flow,
+        noise_draws,
+        beacon_strength,
+        is_activity,
+    )
+    for seg, seg_beacon, seg_mapping, seg_scaffold in zip(
+        segments, beacon.tolist(), mapping.tolist(), scaffold.tolist()
+    ):
+        seg.beacon = seg_beacon
+        seg.mapping = seg_mapping
+        seg.scaffold = seg_scaffold
+
+    monitors = role == MONITOR
+
+    for i in np.flatnonzero(~monitors & (agents.t >= 1.0)).tolist():
+        next_seg = choose_next_segment(segments[seg_id[i]], segments, ROLE_ORDER[role[i]], rng)
+        seg_id[i] = next_seg.seg_id
+        agents.t[i] = 0.0
+
+    for i in np.flatnonzero(monitors & ((agents.t > 1.0) | (agents.t < 0.0))).tolist():
+        seg = segments[seg_id[i]]
+        if agents.t[i] > 1.0:
+            if seg.children and rng.random() > 0.4:
+                next_seg = choose_next_segment(seg, segments, "Monitor", rng)
+                seg_id[i] = next_seg.seg_id
+                agents.t[i] = 0.0
+            else:
+                agents.t[i] = 1.0
+                agents.direction[i] = -1
+        else:
+            if seg.parent_id is not None and rng.random() > 0.3:
+                seg_id[i] = seg.parent_id
+                agents.t[i] = 1.0
+            else:
+                agents.t[i] = 0.0
+                agents.direction[i] = 1
 
+    return worker_activity
 
-def draw_ui(draw, width, height, status, control, reset_flash):
-    panel_bg = (240, 240, 245)
-    panel_border = (80, 80, 90)
-    title_color = (20, 20, 20)
 
-    status_panel = [10, 10, 300, 170]
-    draw.rectangle(status_panel, fill=panel_bg, outline=panel_border)
-    draw.text((20, 18), "Swarm Vein Simulation", fill=title_color)
+# Agent sprites are centred at (AGENT_SPRITE_CENTER, AGENT_SPRITE_CENTER)
+AGENT_SPRITE_CENTER = max(ROLE_SIZES.values()) + 2
 
-    y = 40
-    for line, color in status:
-        draw.text((20, y), line, fill=color)
-        y += 16
 
-    control_panel = [width - 300, 10, width - 10, 185]
-    draw.rectangle(control_panel, fill=panel_bg, outline=panel_border)
-    draw.text((width - 290, 18), "Control Panel", fill=title_color)
+def agent_sprite(role):
+    """Agent marker for a role (with the Scout halo) as an RGB array and mask."""
+    radius = ROLE_SIZES[role]
+    c = AGENT_SPRITE_CENTER
+    sprite = Image.new("RGBA", (2 * c + 1, 2 * c + 1), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite)
+    bbox = [c - radius, c - radius, c + radius, c + radius]
+    if role == "Monitor":
+        draw.ellipse(bbox, outline=ROLE_OUTLINES[role], width=1)
+    else:
+        draw.ellipse(bbox, fill=ROLE_COLORS[role], outline=ROLE_OUTLINES[role])
+    if role == "Scout":
+        draw.ellipse([c - radius - 2, c - radius - 2, c + radius + 2, c + radius + 2],
+                     outline=(200, 230, 250), width=1)
+    return sprite_arrays(sprite)
+
 
-    y = 40
+@lru_cache(maxsize=None)
+def agent_sprite_table():
+    """All role sprites in ROLE_ORDER, flattened for stamp_sprites."""
+    return sprite_table([agent_sprite(role) for role in ROLE_ORDER])
+
+
+PANEL_BG = (240, 240, 245)
+PANEL_BORDER = (80, 80, 90)
+TITLE_COLOR = (20, 20, 20)
+
+
+@lru_cache(maxsize=None)
+def render_status_panel():
+    """Empty status panel (frame and title), 291x161, placed at (10, 10)."""
+    panel = Image.new("RGB", (291, 161))
+    draw = ImageDraw.Draw(panel)
+    draw.rectangle([0, 0, 290, 160], fill=PANEL_BG, outline=PANEL_BORDER)
+    draw.text((10, 8), "Swarm Vein Simulation", fill=TITLE_COLOR, font=FONT)
+    return np.array(panel)
+
+
+@lru_cache(maxsize=8)
+def render_control_panel(control, reset_flash):
+    """
+    Complete control panel, 291x176, placed at (width - 300, 10). Its lines
+    only change with the run settings and the reset flash, so it is cached.
+    """
+    panel = Image.new("RGB", (291, 176))
+    draw = ImageDraw.Draw(panel)
+    draw.rectangle([0, 0, 290, 175], fill=PANEL_BG, outline=PANEL_BORDER)
+    draw.text((10, 8), "Control Panel", fill=TITLE_COLOR, font=FONT)
+
+    y = 30
     for line, color in control:
-        draw.text((width - 290, y), line, fill=color)
+        draw.text((10, y), line, fill=color, font=FONT)
         y += 16
 
-    reset_box = [width - 290, 150, width - 30, 175]
+    # The reset button is drawn last and covers the bottom of the last line
     reset_color = (255, 220, 150) if reset_flash else (220, 220, 230)
-    draw.rectangle(reset_box, fill=reset_color, outline=panel_border)
-    draw.text((width - 280, 154), "Reset scenario", fill=(30, 30, 30))
+    draw.rectangle([10, 140, 270, 165], fill=reset_color, outline=PANEL_BORDER)
+    draw.text((20, 144), "Reset scenario", fill=(30, 30, 30), font=FONT)
+    return np.array(panel)
+
+
+def draw_ui(canvas, width, height, status, control, reset_flash):
+    """
+    Paint the status and control panels onto the frame array from cached
+    tiles; only the status lines are drawn per frame, from cached glyph masks.
+    """
+    canvas[10:171, 10:301] = render_status_panel()
+    y = 40
+    for line, color in status:
+        draw_text(canvas, (20, y), line, color, FONT)
+        y += 16
 
+    canvas[10:186, width - 300:width - 9] = render_control_panel(tuple(control), reset_flash)
 
-def render_frame(frame_idx, fps, width, height, segments, agents, sensor_field, sensor_overlay, ui_data, render_rng):
+
+@lru_cache(maxsize=8)
+def render_vessel_layer(width, height, strokes):
+    """
+    Background, vessel lines and pressure rings for one set of per-segment
+    strokes (start, end, colour, line width, ring radius or 0). Colours and
+    widths are whole numbers, so consecutive frames mostly share a layer.
+    """
     img = Image.new("RGB", (width, height), color=(245, 245, 250))
     draw = ImageDraw.Draw(img)
+    vessel_shadow = (200, 160, 165)
+    for start, end, color, line_width, spike_radius in strokes:
+        draw.line([start, end], fill=vessel_shadow, width=line_width + 4)
+        draw.line([start, end], fill=color, width=line_width)
+
+        if spike_radius:
+            mid_x, mid_y = (start[0] + end[0]) / 2.0, (start[1] + end[1]) / 2.0
+            draw.ellipse(
+                [mid_x - spike_radius, mid_y - spike_radius, mid_x + spike_radius, mid_y + spike_radius],
+                outline=(255, 120, 60),
+                width=2,
+            )
+    return np.array(img)
+
+
+@lru_cache(maxsize=None)
+def overlay_colors(sensor_field, base_color):
+    """256-step ramp from the vessel base colour to the sensor's overlay colour."""
+    overlay_color = SENSOR_COLORS[sensor_field]
+    return tuple(lerp_color(base_color, overlay_color, i / 255.0) for i in range(256))
 
+
+def render_frame(frame_idx, fps, width, height, segments, geometry, agents, sensor_field, sensor_overlay, ui_data,
+                 jitter, canvas):
+    """
+    Draw one frame into `canvas` and return it. Segment sensor fields are
+    read as they are, so the caller must run compute_fields() on every
+    segment after the frame's last state change.
+    """
     base_color = (170, 110, 120)
-    vessel_shadow = (200, 160, 165)
     line_base_width = 14
 
-    for seg in segments:
-        seg.compute_fields()
-
     label_segments = []
     sensor_norm_key = SENSOR_NORM_KEYS[sensor_field]
+    overlay_ramp = overlay_colors(sensor_field, base_color)
     if sensor_overlay:
         label_segments = sorted(
             segments,
-            key=lambda seg: seg.fields.get(sensor_norm_key, seg.fields.get("strain_norm", 0.0)),
+            key=lambda seg: getattr(seg, sensor_norm_key),
             reverse=True,
         )[:2]
 
+    strokes = []
     for seg in segments:
-        sensor_norm = seg.fields.get(sensor_norm_key, seg.fields.get("strain_norm", 0.0))
+        sensor_norm = getattr(seg, sensor_norm_key)
 
         color = base_color
         width_mod = 0
 
         if sensor_overlay:
-            overlay_color = SENSOR_COLORS[sensor_field]
-            color = lerp_color(base_color, overlay_color, sensor_norm)
+            color = overlay_ramp[int(sensor_norm * 255)]
             width_mod = int(6 * sensor_norm)
 
         if seg.scaffold > 0.2:
@@ -328,57 +511,37 @@ def render_frame(frame_idx, fps, width, height, segments, agents, sensor_field,
         if seg.blockage > 0.6 and not sensor_overlay:
             color = lerp_color(color, (200, 90, 90), min(1.0, seg.blockage))
 
-        draw.line([seg.start, seg.end], fill=vessel_shadow, width=line_base_width + width_mod + 4)
-        draw.line([seg.start, seg.end], fill=color, width=line_base_width + width_mod)
+        spike_radius = 6 + int(8 * seg.pressure_spike) if seg.pressure_spike > 0.4 else 0
+        strokes.append((seg.start, seg.end, color, line_base_width + width_mod, spike_radius))
 
-        if seg.pressure_spike > 0.4:
-            mid_x, mid_y = seg.midpoint()
-            spike_radius = 6 + int(8 * seg.pressure_spike)
-            draw.ellipse(
-                [mid_x - spike_radius, mid_y - spike_radius, mid_x + spike_radius, mid_y + spike_radius],
-                outline=(255, 120, 60),
-                width=2,
-            )
+    # Only the dynamic layers are drawn on top of the (cached) vessel layer
+    np.copyto(canvas, render_vessel_layer(width, height, tuple(strokes)))
 
     if label_segments and sensor_overlay:
         offsets = [(10, -18), (10, 12)]
         for seg, offset in zip(label_segments, offsets):
-            sensor_value = seg.fields.get(sensor_field, 0.0)
-            if seg.fields.get(sensor_norm_key, 0.0) < 0.55:
+            sensor_value = getattr(seg, sensor_field)
+            if getattr(seg, sensor_norm_key) < 0.55:
                 continue
             mid_x, mid_y = seg.midpoint()
             text = f"{seg.name} {SENSOR_SHORT[sensor_field]} {sensor_value:.2f}"
-            draw.text((mid_x + offset[0], mid_y + offset[1]), text, fill=(50, 50, 50))
-
-    for agent in agents:
-        seg = segments[agent.segment_id]
-        dx = seg.end[0] - seg.start[0]
-        dy = seg.end[1] - seg.start[1]
-        length = math.hypot(dx, dy) or 1.0
-        ux, uy = dx / length, dy / length
-        px, py = -uy, ux
-
-        jitter = 0.8
-        offset = (render_rng.uniform(-jitter, jitter), render_rng.uniform(-jitter, jitter))
-        x = seg.start[0] + ux * seg.length * agent.t + px * offset[0]
-        y = seg.start[1] + uy * seg.length * agent.t + py * offset[1]
-
-        radius = ROLE_SIZES[agent.role]
-        color = ROLE_COLORS[agent.role]
-        outline = ROLE_OUTLINES[agent.role]
-
-        if agent.role == "Monitor":
-            draw.ellipse([x - radius, y - radius, x + radius, y + radius], outline=outline, width=1)
-        else:
-            draw.ellipse([x - radius, y - radius, x + radius, y + radius], fill=color, outline=outline)
+            draw_text(canvas, (mid_x + offset[0], mid_y + offset[1]), text, (50, 50, 50), FONT)
+
+    # Agent positions along their segments, with this frame's jitter across
+    # the vessel
+    seg_id = agents.segment_id
+    travel = geometry["length"][seg_id] * agents.t
+    xs = geometry["start_x"][seg_id] + geometry["ux"][seg_id] * travel + geometry["px"][seg_id] * jitter[:, 0]
+    ys = geometry["start_y"][seg_id] + geometry["uy"][seg_id] * travel + geometry["py"][seg_id] * jitter[:, 1]
 
-        if agent.role == "Scout":
-            draw.ellipse([x - radius - 2, y - radius - 2, x + radius + 2, y + radius + 2],
-                         outline=(200, 230, 250), width=1)
+    # Agents are composited as pre-rendered sprites; PIL truncates float
+    # ellipse coordinates, so sprites land at the floor
+    stamp_sprites(canvas, agent_sprite_table(), agents.role,
+                  np.floor(xs).astype(int) - AGENT_SPRITE_CENTER, np.floor(ys).astype(int) - AGENT_SPRITE_CENTER)
 
-    draw_ui(draw, width, height, ui_data["status"], ui_data["control"], ui_data["reset_flash"])
+    draw_ui(canvas, width, height, ui_data["status"], ui_data["control"], ui_data["reset_flash"])
 
-    return img
+    return canvas
 
 
 def create_swarm_simulation(
@@ -394,11 +557,16 @@ def create_swarm_simulation(
     fps=30,
     seed=7,
     reset_at=None,
+    render_stride=1,
 ):
     import imageio
 
+    if render_stride < 1:
+        raise ValueError(f"render_stride must be at least 1, got {render_stride}")
+
     rng = random.Random(seed)
-    render_rng = random.Random(seed + 101)
+    gen = np.random.default_rng(seed)
+    render_gen = np.random.default_rng(seed + 101)
 
     output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs")
     os.makedirs(output_dir, exist_ok=True)
@@ -407,7 +575,13 @@ def create_swarm_simulation(
     width, height = 800, 600
     num_frames = int(duration_sec * fps)
 
+    # All per-agent random draws for the run, made up front: flow noise for
+    # the simulation and position jitter for rendering
+    noise_buf = gen.uniform(-noise, noise, size=(num_frames, swarm_size))
+    jitter_buf = render_gen.uniform(-0.8, 0.8, size=(num_frames, swarm_size, 2))
+
     segments = build_vein_network()
+    geometry = segment_geometry(segments)
     initialize_pathology(segments)
 
     agents = create_agents(swarm_size, rng)
@@ -420,7 +594,11 @@ def create_swarm_simulation(
         reset_frames.append(int(reset_at * fps))
     reset_frames = sorted(set(frame for frame in reset_frames if 0 <= frame < num_frames))
 
-    frames = []
+    # Frames are streamed to the encoder as they are drawn instead of being
+    # held in memory; every frame is drawn into the same buffer
+    print(f"Writing video to {video_path}...", flush=True)
+    writer = imageio.get_writer(video_path, fps=fps / render_stride, codec="libx264", quality=7, macro_block_size=1)
+    canvas = np.empty((height, width, 3), dtype=np.uint8)
     support_peak_history = []
     support_peak = 0.0
     last_reset_time = 0.0
@@ -459,62 +637,10 @@ def create_swarm_simulation(
 
         update_role_switching(agents, segments, rng, role_switch, fps, frame_idx)
 
-        worker_activity = {seg.seg_id: 0 for seg in segments}
-
-        for agent in agents:
-            seg = segments[agent.segment_id]
-            signal = seg.fields.get("abnormal", 0.0)
-
-            if agent.role == "Scout":
-                if signal > 0.55:
-                    seg.beacon = clamp(seg.beacon + beacon_strength * (0.03 + 0.05 * signal), 0.0, 1.0)
-
-            if agent.role == "Worker":
-                if seg.beacon > 0.3 or seg.blockage > 0.4:
-                    worker_activity[seg.seg_id] += 1
-
-            if agent.role == "Monitor":
-                seg.mapping = clamp(seg.mapping + 0.003, 0.0, 1.0)
-
-            if agent.role == "Support" and is_activity:
-                if seg.fields.get("strain_norm", 0.0) > 0.6 or seg.pressure_spike > 0.4:
-                    seg.scaffold = clamp(seg.scaffold + 0.04, 0.0, 1.0)
-
-            base_speed = flow
-            if agent.role == "Worker" and (seg.beacon > 0.4 or seg.blockage > 0.5):
-                base_speed *= 0.45
-            if agent.role == "Support" and seg.fields.get("strain_norm", 0.0) > 0.5:
-                base_speed *= 0.35
-            if agent.role == "Monitor":
-                base_speed *= 0.8
-
-            speed = max(0.05, base_speed + rng.uniform(-noise, noise))
-            step = speed / seg.length
-
-            if agent.role == "Monitor":
-                agent.t += step * agent.direction
-                if agent.t > 1.0:
-                    if seg.children and rng.random() > 0.4:
-                        next_seg = choose_next_segment(seg, segments, agent.role, rng)
-                        agent.segment_id = next_seg.seg_id
-                        agent.t = 0.0
-                    else:
-                        agent.t = 1.0
-                        agent.direction = -1
-                elif agent.t < 0.0:
-                    if seg.parent_id is not None and rng.random() > 0.3:
-                        agent.segment_id = seg.parent_id
-                        agent.t = 1.0
-                    else:
-                        agent.t = 0.0
-                        agent.direction = 1
-            else:
-                agent.t += step
-                if agent.t >= 1.0:
-                    next_seg = choose_next_segment(seg, segments, agent.role, rng)
-                    agent.segment_id = next_seg.seg_id
-                    agent.t = 0.0
+        worker_activity = step_agents(agents, segments, flow, noise_buf[frame_idx], beacon_strength, is_activity, rng)
 
+        # The frame's aggregate stats are accumulated in the same pass
+        total_mapping = total_blockage = total_scaffold = 0.0
         for seg in segments:
             reduction = 0.00005 * worker_activity[seg.seg_id] * (1.0 + seg.beacon)
             seg.blockage = clamp(seg.blockage - reduction, 0.0, 1.0)
@@ -522,12 +648,20 @@ def create_swarm_simulation(
             if seg.scaffold > 0.01:
                 seg.pressure_spike = clamp(seg.pressure_spike - 0.04 * seg.scaffold, 0.0, 1.0)
 
-        mapped_percent = sum(seg.mapping for seg in segments) / len(segments) * 100.0
-        total_blockage = sum(seg.blockage for seg in segments)
+            total_mapping += seg.mapping
+            total_blockage += seg.blockage
+            total_scaffold += seg.scaffold
+
+        mapped_percent = total_mapping / len(segments) * 100.0
         blockage_reduced = (initial_total_blockage - total_blockage) / initial_total_blockage * 100.0
-        support_deployed = sum(seg.scaffold for seg in segments) / len(segments) * 100.0
+        support_deployed = total_scaffold / len(segments) * 100.0
         support_peak = max(support_peak, support_deployed)
 
+        # The swarm steps every frame; only every render_stride-th frame is
+        # drawn, and the video frame rate is lowered to match
+        if frame_idx % render_stride:
+            continue
+
         counts = role_counts(agents)
         status_lines = [
             (f"Mapped: {mapped_percent:5.1f}%", (20, 20, 20)),
@@ -552,6 +686,10 @@ def create_swarm_simulation(
             (f"Sensor: {sensor_field.title()}", (20, 20, 20)),
         ]
 
+        # Refresh the sensor fields after this frame's updates, for the renderer
+        for seg in segments:
+            seg.compute_fields()
+
         reset_flash = any(abs(frame_idx - frame) <= 4 for frame in reset_frames if frame != 0)
 
         ui_data = {
@@ -566,19 +704,20 @@ def create_swarm_simulation(
             width,
             height,
             segments,
+            geometry,
             agents,
             sensor_field,
             sensor_overlay,
             ui_data,
-            render_rng,
+            jitter_buf[frame_idx],
+            canvas,
         )
-        frames.append(frame)
+        writer.append_data(frame)
 
+    writer.close()
     support_peak_history.append(round(support_peak, 3))
 
-    print(f"Generated {len(frames)} frames for swarm simulation", flush=True)
-    print(f"Saving video to {video_path}...", flush=True)
-    imageio.mimsave(video_path, frames, fps=fps)
+    print(f"Generated {len(range(0, num_frames, render_stride))} frames for swarm simulation", flush=True)
 
     final_counts = role_counts(agents)
     final_mapped = sum(seg.mapping for seg in segments) / len(segments) * 100.0
@@ -618,7 +757,11 @@ def parse_args():
     parser.add_argument("--fps", type=int, default=30)
     parser.add_argument("--seed", type=int, default=7)
     parser.add_argument("--reset_at", type=float, default=None)
-    return parser.parse_args()
+    parser.add_argument("--render_stride", type=int, default=1)
+    args = parser.parse_args()
+    if args.render_stride < 1:
+        parser.error("--render_stride must be at least 1")
+    return args
 
 
 if __name__ == "__main__":
@@ -636,4 +779,5 @@ if __name__ == "__main__":
         fps=args.fps,
         seed=args.seed,
         reset_at=args.reset_at,
+        render_stride=args.render_stride,
     )
@@ -11,7 +11,7 @@ except ImportError as e:
     print(f"Failed to import imageio: {e}", flush=True)
     exit(1)
 
-OUTPUT_DIR = "c:\\Sansten\\vRobot\\outputs"
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs")
 VIDEO_PATH = os.path.join(OUTPUT_DIR, "nanobot_sim.mp4")
 
 print(f"Output directory: {OUTPUT_DIR}", flush=True)
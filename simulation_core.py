@@ -0,0 +1,67 @@
+"""
+Compiled per-frame agent update for the swarm vein simulation.
+Operates on plain NumPy arrays (agents and segments as parallel arrays) so the
+kernel can be JIT-compiled with Numba; without Numba it runs as vectorized NumPy.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the kernel below runs as plain NumPy.
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Role indices, matching ROLE_ORDER in run_swarm_vein_sim.py
+SCOUT, WORKER, SUPPORT, MONITOR = 0, 1, 2, 3
+
+
+@njit(cache=True, fastmath=True)
+def step_swarm(role, seg_id, t, direction, abnormal, strain, blockage, pressure_spike,
+               beacon, mapping, scaffold, length, flow, noise_draws, beacon_strength, is_activity):
+    """
+    Apply one frame of role effects and movement.
+
+    Scouts raise the beacon on abnormal segments, Monitors map and (in activity
+    mode) Supports scaffold strained segments; beacon, mapping and scaffold are
+    updated in place. Scouts act first, so Workers see this frame's beacon.
+    Every agent then advances t by its speed (flow, slowed per role, plus the
+    pre-drawn noise) over the segment length; Monitors move along `direction`.
+    Boundary crossings are left to the caller. Returns the active Worker count
+    per segment.
+    """
+    num_segments = length.shape[0]
+    scouts = role == SCOUT
+    workers = role == WORKER
+    supports = role == SUPPORT
+    monitors = role == MONITOR
+
+    # Clamped repeated increments collapse to one clamped increment per segment
+    scout_counts = np.bincount(seg_id[scouts], minlength=num_segments)
+    boost = np.where(abnormal > 0.55, beacon_strength * (0.03 + 0.05 * abnormal), 0.0)
+    beacon[:] = np.where(scout_counts > 0, np.minimum(1.0, beacon + boost * scout_counts), beacon)
+
+    monitor_counts = np.bincount(seg_id[monitors], minlength=num_segments)
+    mapping[:] = np.where(monitor_counts > 0, np.minimum(1.0, mapping + 0.003 * monitor_counts), mapping)
+
+    if is_activity:
+        support_counts = np.bincount(seg_id[supports], minlength=num_segments)
+        scaffolding = (support_counts > 0) & ((strain > 0.6) | (pressure_spike > 0.4))
+        scaffold[:] = np.where(scaffolding, np.minimum(1.0, scaffold + 0.04 * support_counts), scaffold)
+
+    agent_beacon = beacon[seg_id]
+    agent_blockage = blockage[seg_id]
+    active_workers = workers & ((agent_beacon > 0.3) | (agent_blockage > 0.4))
+    worker_activity = np.bincount(seg_id[active_workers], minlength=num_segments)
+
+    base_speed = np.full(role.shape[0], flow)
+    base_speed = np.where(workers & ((agent_beacon > 0.4) | (agent_blockage > 0.5)), base_speed * 0.45, base_speed)
+    base_speed = np.where(supports & (strain[seg_id] > 0.5), base_speed * 0.35, base_speed)
+    base_speed = np.where(monitors, base_speed * 0.8, base_speed)
+    step = np.maximum(0.05, base_speed + noise_draws) / length[seg_id]
+
+    # Only Monitors walk upstream; the other roles always move downstream
+    t += np.where(monitors, step * direction, step)
+    return worker_activity
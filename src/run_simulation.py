@@ -1,4 +1,6 @@
 import os
+import queue
+import threading
 import time
 from simulation.vein_env import VeinEnvironment
 from simulation.nanobot import Nanobot
@@ -12,6 +14,33 @@ def ensure_dirs():
     os.makedirs(FRAMES_DIR, exist_ok=True)
 
 
+class FrameWriter(threading.Thread):
+    """
+    Encode frames on a background thread so the physics loop doesn't wait on
+    the encoder. Frames go through a bounded queue; put None on `frames` to
+    finish. If the encoder fails, the exception is kept in `error` and the
+    remaining frames are discarded.
+    """
+
+    def __init__(self, writer, max_pending=32):
+        super().__init__(daemon=True)
+        self.writer = writer
+        self.frames = queue.Queue(maxsize=max_pending)
+        self.error = None
+
+    def run(self):
+        frame = self.frames.get()
+        try:
+            while frame is not None:
+                self.writer.append_data(frame)
+                frame = self.frames.get()
+        except Exception as e:
+            self.error = e
+            # Keep consuming so the simulation loop never blocks on a full queue
+            while self.frames.get() is not None:
+                pass
+
+
 def main(gui: bool = True, record_video: bool = True):
     print(f"Entering main(gui={gui}, record_video={record_video})", flush=True)
     import pybullet as p
@@ -20,11 +49,22 @@ def main(gui: bool = True, record_video: bool = True):
     print("PyBullet data imported", flush=True)
     import imageio
     print("imageio imported", flush=True)
+    import numpy as np
     
     print(f"Output directory: {OUTPUT_DIR}", flush=True)
     print(f"Frames directory: {FRAMES_DIR}", flush=True)
     ensure_dirs()
 
+    # Frames are streamed to the encoder instead of being held in memory
+    writer = None
+    frame_writer = None
+    frames_captured = 0
+    if record_video:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        writer = imageio.get_writer(VIDEO_PATH, fps=30, codec='libx264', macro_block_size=1)
+        frame_writer = FrameWriter(writer)
+        frame_writer.start()
+
     conn_mode = p.GUI if gui else p.DIRECT
     p.connect(conn_mode)
     p.setAdditionalSearchPath(pybullet_data.getDataPath())
@@ -37,7 +77,6 @@ def main(gui: bool = True, record_video: bool = True):
 
     target = (0.0, 0.0, 0.0)
     done = False
-    frames = []
 
     # Optional: slow down for viewing when GUI is on
     step_sleep = 1.0/240.0 if gui else 0.0
@@ -50,8 +89,8 @@ def main(gui: bool = True, record_video: bool = True):
                 env.remove_clog(clog_id)
                 done = True
         p.stepSimulation()
-        if record_video:
-            # Capture camera image
+        # Capture camera image, unless the encoder has already failed
+        if frame_writer is not None and frame_writer.error is None:
             try:
                 if gui:
                     width, height, view_matrix, proj_matrix, _, _, _, _, _, _, _, _ = p.getDebugVisualizerCamera()
@@ -60,19 +99,30 @@ def main(gui: bool = True, record_video: bool = True):
                 else:
                     # Headless mode: use default camera
                     img = p.getCameraImage(640, 480)
-                frame = img[2]  # RGB array
-                frames.append(frame)
+                # RGBA pixels, flat or (height, width, 4) depending on the build
+                frame = np.reshape(np.asarray(img[2], dtype=np.uint8), (img[1], img[0], 4))[..., :3]
             except Exception as e:
                 pass  # Skip frame on error
+            else:
+                frame_writer.frames.put(frame)
+                frames_captured += 1
         if step_sleep:
             time.sleep(step_sleep)
 
-    if record_video and frames:
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        imageio.mimsave(VIDEO_PATH, frames, fps=30)
-        print(f"Saved video to: {VIDEO_PATH}")
-    elif record_video:
-        print(f"No frames captured. Frames list: {len(frames)} items")
+    if frame_writer is not None:
+        frame_writer.frames.put(None)
+        frame_writer.join()
+        error = frame_writer.error
+        try:
+            writer.close()
+        except Exception as e:
+            error = error or e
+        if error is not None:
+            print(f"Video writer failed: {error}", flush=True)
+        elif frames_captured:
+            print(f"Saved video to: {VIDEO_PATH}")
+        else:
+            print("No frames captured.")
 
     p.disconnect()
     print("Simulation complete.", "Clog cleared." if done else "Clog not reached in time.")
@@ -3,76 +3,124 @@
 Simplified nanobot simulation - creates demo video showing nanobot clearing a vein clog.
 """
 import os
+import shutil
+import subprocess
+from functools import lru_cache
+
 import numpy as np
 import imageio
 
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "outputs")
 VIDEO_PATH = os.path.join(OUTPUT_DIR, "nanobot_sim.mp4")
 
+# Frame colours, built once rather than as a list on every draw
+BG_GRAY = 240  # Light gray background, cleared with a single fill
+WALL_COLOR = np.array([200, 200, 200], dtype=np.uint8)
+CLOG_COLOR = np.array([200, 50, 50], dtype=np.uint8)
+BOT_COLOR = np.array([50, 100, 200], dtype=np.uint8)
+
+@lru_cache(maxsize=None)
+def disk_mask(r):
+    """Boolean (2r+1, 2r+1) mask of the disk of radius r, built once per radius."""
+    yy, xx = np.ogrid[-r:r + 1, -r:r + 1]
+    return xx * xx + yy * yy <= r * r
+
+def draw_disk(img, cx, cy, r, color):
+    """Fill the disk of radius r centred at (cx, cy), clipped to the image."""
+    height, width = img.shape[:2]
+    x0, x1 = max(0, cx - r), min(width, cx + r + 1)
+    y0, y1 = max(0, cy - r), min(height, cy + r + 1)
+    if x0 >= x1 or y0 >= y1:
+        return
+    mask = disk_mask(r)
+    region = img[y0:y1, x0:x1]
+    region[mask[y0 - (cy - r):y1 - (cy - r), x0 - (cx - r):x1 - (cx - r)]] = color
+
+def video_writer_options():
+    """
+    Encoder settings for the demo video: NVENC when an NVIDIA GPU and an
+    ffmpeg build with h264_nvenc are both available, otherwise imageio's
+    default libx264 settings.
+    """
+    if shutil.which("nvidia-smi") is None:
+        return {}
+    try:
+        import imageio_ffmpeg
+        if subprocess.run(["nvidia-smi"], capture_output=True).returncode != 0:
+            return {}
+        encoders = subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-encoders"],
+                                  capture_output=True, text=True).stdout
+    except (ImportError, OSError, RuntimeError):
+        return {}
+    if "h264_nvenc" not in encoders:
+        return {}
+    return {"codec": "h264_nvenc", "quality": None, "ffmpeg_params": ["-preset", "p4"]}
+
 def create_demo_animation():
-    """Create a simple 2D animation of nanobot clearing a clog."""
-    frames = []
+    """
+    Create a simple 2D animation of nanobot clearing a clog.
+    Yields each frame in turn; every frame is drawn into the same buffer, so
+    consume (or copy) it before advancing.
+    """
     width, height = 640, 480
     num_frames = 120
+    img = np.empty((height, width, 3), dtype=np.uint8)
+    
+    # Clog (red circle) moves right and shrinks as the nanobot clears it;
+    # the whole trajectory is computed up front
+    clog_center_y = 240
+    clog_radius = 30
+    frame_ids = np.arange(num_frames)
+    progress = (frame_ids / num_frames).tolist()
+    clog_xs = (320 + (frame_ids - 80) * 2).tolist()
+    clog_sizes = (clog_radius * (1 - frame_ids / num_frames * 0.9)).astype(int).tolist()
+    bot_xs = (100 + frame_ids * 4).tolist()
+    bot_radius = 12
     
     for frame_idx in range(num_frames):
-        # Create frame
-        img = np.ones((height, width, 3), dtype=np.uint8) * 240  # Light gray background
+        # Clear frame
+        img.fill(BG_GRAY)
         
         # Draw vein walls (top and bottom white lines)
-        img[100:120, :] = [200, 200, 200]  # Top wall
-        img[360:380, :] = [200, 200, 200]  # Bottom wall
+        img[100:120] = WALL_COLOR  # Top wall
+        img[360:380] = WALL_COLOR  # Bottom wall
         
-        # Draw clog (red circle) that moves/shrinks as nanobot clears it
-        clog_center_y = 240
-        clog_radius = 30
-        progress = frame_idx / num_frames
-        
-        # Clog shrinks and moves
-        if progress < 0.8:
-            clog_x = 320 + (frame_idx - 80) * 2  # Move right
-            clog_size = int(clog_radius * (1 - progress * 0.9))  # Shrink
-            
-            # Draw clog as a filled circle approximation
-            for dy in range(-clog_size, clog_size + 1):
-                for dx in range(-clog_size, clog_size + 1):
-                    if dx*dx + dy*dy <= clog_size*clog_size:
-                        x, y = clog_x + dx, clog_center_y + dy
-                        if 0 <= x < width and 0 <= y < height:
-                            img[y, x] = [200, 50, 50]  # Red clog
+        # Draw clog until it is cleared
+        if progress[frame_idx] < 0.8:
+            draw_disk(img, clog_xs[frame_idx], clog_center_y, clog_sizes[frame_idx], CLOG_COLOR)  # Red clog
         
         # Draw nanobot (blue circle)
-        bot_x = int(100 + frame_idx * 4)
-        bot_radius = 12
-        for dy in range(-bot_radius, bot_radius + 1):
-            for dx in range(-bot_radius, bot_radius + 1):
-                if dx*dx + dy*dy <= bot_radius*bot_radius:
-                    x, y = bot_x + dx, 240 + dy
-                    if 0 <= x < width and 0 <= y < height:
-                        img[y, x] = [50, 100, 200]  # Blue nanobot
-        
-        # Add text
-        import textwrap
-        if progress < 0.8:
-            status = f"Clearing clog... {int(progress * 100)}%"
-        else:
-            status = "Clog cleared!"
-        
-        # Add simple text overlay (using numpy, so it's basic)
-        y_text = 50
-        frames.append(img)
-    
-    return frames
+        draw_disk(img, bot_xs[frame_idx], 240, bot_radius, BOT_COLOR)  # Blue nanobot
+        yield img
+
+def write_demo_video(options):
+    """Encode the demo animation to VIDEO_PATH with the given writer options; returns the frame count."""
+    # Frames are encoded as they are drawn instead of being held in memory
+    num_frames = 0
+    with imageio.get_writer(VIDEO_PATH, fps=30, **options) as writer:
+        for frame in create_demo_animation():
+            writer.append_data(frame)
+            num_frames += 1
+    return num_frames
 
 def main():
     print("Creating demo animation...", flush=True)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    frames = create_demo_animation()
-    print(f"Generated {len(frames)} frames", flush=True)
-    
     print(f"Saving video to {VIDEO_PATH}...", flush=True)
-    imageio.mimsave(VIDEO_PATH, frames, fps=30)
+    options = video_writer_options()
+    try:
+        num_frames = write_demo_video(options)
+    except Exception as e:
+        if not options:
+            raise
+        # ffmpeg can list h264_nvenc and still fail to open it (driver
+        # mismatch, no free encoder session); that only surfaces once frames
+        # are written, so the demo is re-encoded from the start with libx264
+        reason = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+        print(f"NVENC encoding failed ({reason}); falling back to libx264", flush=True)
+        num_frames = write_demo_video({})
+    print(f"Generated {num_frames} frames", flush=True)
     print(f"Video saved successfully to {VIDEO_PATH}", flush=True)
 
 if __name__ == "__main__":
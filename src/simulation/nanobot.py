@@ -1,27 +1,92 @@
-from typing import Tuple
+from typing import Sequence, Tuple
+
+import numpy as np
+import pybullet as p
+
+
+def _apply_forces(body_ids, positions, targets, magnitude) -> None:
+    """
+    Pull each body towards its target with force magnitude * (target - position),
+    the steering rule of Nanobot.apply_force_towards, computed for all bodies in
+    one NumPy pass. `positions` is (N, 3); `targets` is one (x, y, z) or (N, 3);
+    `magnitude` is a scalar or one value per body.
+    """
+    forces = np.reshape(magnitude, (-1, 1)) * (np.asarray(targets, dtype=float) - positions)
+    for body_id, force, pos in zip(body_ids, forces.tolist(), positions.tolist()):
+        p.applyExternalForce(body_id, -1, force, pos, flags=p.WORLD_FRAME)
+
 
 class Nanobot:
     def __init__(self, start_pos: Tuple[float, float, float], radius: float = 0.05, mass: float = 1.0):
         self.radius = radius
         self.mass = mass
         self.body_id = self._create_body(start_pos)
+        # Reused for every applyExternalForce call instead of a new list per step
+        self._force_buf = [0.0, 0.0, 0.0]
 
     def _create_body(self, start_pos):
-        import pybullet as p
         bot_collision = p.createCollisionShape(p.GEOM_SPHERE, radius=self.radius)
         bot_visual = p.createVisualShape(p.GEOM_SPHERE, radius=self.radius, rgbaColor=[0.2, 0.2, 1.0, 1])
         return p.createMultiBody(baseMass=self.mass, baseCollisionShapeIndex=bot_collision,
                                  baseVisualShapeIndex=bot_visual, basePosition=list(start_pos))
 
     def apply_force_towards(self, target: Tuple[float, float, float], magnitude: float = 5.0) -> None:
-        import pybullet as p
         pos, _ = p.getBasePositionAndOrientation(self.body_id)
-        dir_vec = [target[i] - pos[i] for i in range(3)]
-        p.applyExternalForce(self.body_id, -1,
-                             [magnitude * dir_vec[0], magnitude * dir_vec[1], magnitude * dir_vec[2]],
-                             pos, flags=p.WORLD_FRAME)
+        force = self._force_buf
+        force[0] = magnitude * (target[0] - pos[0])
+        force[1] = magnitude * (target[1] - pos[1])
+        force[2] = magnitude * (target[2] - pos[2])
+        p.applyExternalForce(self.body_id, -1, force, pos, flags=p.WORLD_FRAME)
+
+    @staticmethod
+    def apply_forces_batch(bots: Sequence["Nanobot"], targets, magnitude=5.0) -> None:
+        """
+        Same as calling apply_force_towards on every bot, with the forces for
+        the whole group computed in one NumPy pass. `targets` is a single
+        (x, y, z) shared by all bots or one target per bot; `magnitude` is a
+        scalar or one value per bot.
+        """
+        if not bots:
+            return
+        body_ids = [bot.body_id for bot in bots]
+        positions = np.array([p.getBasePositionAndOrientation(body_id)[0] for body_id in body_ids])
+        _apply_forces(body_ids, positions, targets, magnitude)
 
     def position(self) -> Tuple[float, float, float]:
-        import pybullet as p
-        pos, _ = p.getBasePositionAndOrientation(self.body_id)
-        return tuple(pos)
+        # pybullet already returns the position as a tuple
+        return p.getBasePositionAndOrientation(self.body_id)[0]
+
+
+class NanobotSwarm:
+    """
+    A group of identical nanobots kept as flat arrays, body_ids (N,) and
+    positions (N, 3), so that steering math runs on the whole swarm at once
+    instead of through one Nanobot object per bot.
+    """
+    def __init__(self, start_positions, radius: float = 0.05, mass: float = 1.0):
+        self.radius = radius
+        self.mass = mass
+        self.positions = np.array(start_positions, dtype=float).reshape(-1, 3)
+        bot_collision = p.createCollisionShape(p.GEOM_SPHERE, radius=radius)
+        bot_visual = p.createVisualShape(p.GEOM_SPHERE, radius=radius, rgbaColor=[0.2, 0.2, 1.0, 1])
+        # Every body is created from the shared shapes in a single call
+        self.body_ids = np.array(p.createMultiBody(baseMass=mass, baseCollisionShapeIndex=bot_collision,
+                                                   baseVisualShapeIndex=bot_visual,
+                                                   batchPositions=self.positions.tolist()), dtype=int)
+
+    def __len__(self) -> int:
+        return len(self.body_ids)
+
+    def sync_positions(self) -> np.ndarray:
+        """Refresh the position buffer from the physics engine and return it."""
+        for i, body_id in enumerate(self.body_ids.tolist()):
+            self.positions[i] = p.getBasePositionAndOrientation(body_id)[0]
+        return self.positions
+
+    def apply_forces(self, targets, magnitude=5.0) -> None:
+        """
+        Pull every bot towards its target, like Nanobot.apply_force_towards.
+        `targets` is one (x, y, z) or an (N, 3) array; `magnitude` is a scalar
+        or one value per bot.
+        """
+        _apply_forces(self.body_ids.tolist(), self.sync_positions(), targets, magnitude)
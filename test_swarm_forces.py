@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Smoke check for the batched nanobot steering: Nanobot.apply_forces_batch and
+NanobotSwarm.apply_forces must move bots exactly like per-bot
+apply_force_towards calls. Runs headless in pybullet DIRECT mode.
+"""
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+import pybullet as p
+
+from simulation.nanobot import Nanobot, NanobotSwarm
+
+START_POSITIONS = [(-1.0, 0.0, 0.0), (-0.5, 0.5, 0.0), (0.0, -0.5, 0.2)]
+TARGETS = [(0.0, 0.0, 0.0), (0.5, 0.0, 0.0), (0.0, 0.0, -0.2)]
+MAGNITUDES = [5.0, 2.0, 1.0]
+STEPS = 120
+
+
+def run(scenario_cls):
+    """Steer three bots for STEPS steps in a fresh world; return their final positions."""
+    p.connect(p.DIRECT)
+    try:
+        p.setGravity(0, 0, 0)
+        scenario = scenario_cls()
+        for _ in range(STEPS):
+            scenario.steer()
+            p.stepSimulation()
+        return np.array(scenario.positions())
+    finally:
+        p.disconnect()
+
+
+class PerBot:
+    def __init__(self):
+        self.bots = [Nanobot(start_pos=pos) for pos in START_POSITIONS]
+
+    def steer(self):
+        for bot, target, magnitude in zip(self.bots, TARGETS, MAGNITUDES):
+            bot.apply_force_towards(target, magnitude=magnitude)
+
+    def positions(self):
+        return [bot.position() for bot in self.bots]
+
+
+class Batch(PerBot):
+    def steer(self):
+        Nanobot.apply_forces_batch(self.bots, TARGETS, magnitude=MAGNITUDES)
+
+
+class Swarm:
+    def __init__(self):
+        self.swarm = NanobotSwarm(START_POSITIONS)
+
+    def steer(self):
+        self.swarm.apply_forces(TARGETS, magnitude=MAGNITUDES)
+
+    def positions(self):
+        return self.swarm.sync_positions()
+
+
+if __name__ == "__main__":
+    reference = run(PerBot)
+    assert not np.allclose(reference, START_POSITIONS), "bots did not move"
+    for name, scenario_cls in (("apply_forces_batch", Batch), ("NanobotSwarm.apply_forces", Swarm)):
+        positions = run(scenario_cls)
+        assert np.allclose(positions, reference), f"{name} diverged:\n{positions}\nvs\n{reference}"
+        print(f"{name}: OK", flush=True)
+    print("Batched steering matches per-bot steering.", flush=True)